@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+# Benchmarks run without Postgres, Discord or a .env file, and keep the whole
+# synthetic history instead of the live 5-year window
+os.environ.setdefault("DATABASE_URL", "postgresql://benchmark@localhost/benchmark")
+os.environ.setdefault("MARKET_PHASES", "{}")
+os.environ.setdefault("MARKET_HOLIDAYS", "[]")
+os.environ.setdefault("ACCOUNT_NO", "BENCH")
+os.environ.setdefault("ACCOUNT_BROKER", "BENCH")
+os.environ.setdefault("DISCORD_WEBHOOK_URL", "http://localhost/benchmark")
+os.environ.setdefault("OHLCV_CACHE_DIR", "")
+os.environ.setdefault("OHLCV_HISTORY_YEARS", "100")
+
+from benchmarks.synthetic import InMemoryDB, generate_ohlcv  # noqa: E402
+from core.strategy.sma_strategy import SMAStrategy  # noqa: E402
+from core.trading_bot import TradingBot  # noqa: E402
+from models.trading_bot import TradingMode  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PHASES = ["load", "indicators", "signals", "execution", "evaluation", "loop"]
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = defaultdict(float)
+
+    def wrap(self, phase: str, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] += time.perf_counter() - start
+
+        return timed
+
+
+def _build_bot(n_symbols: int, n_days: int, seed: int) -> TradingBot:
+    db = InMemoryDB(generate_ohlcv(n_symbols, n_days, seed=seed))
+    return TradingBot(SMAStrategy, TradingMode.Backtest, verbose=False, db=db)
+
+
+def run_case(n_symbols: int, n_days: int, seed: int = 0) -> dict:
+    bot = _build_bot(n_symbols, n_days, seed)
+    timer = PhaseTimer()
+    strategy = bot._strategy
+    strategy.signal_buy = timer.wrap("signals", strategy.signal_buy)
+    strategy.signal_sell = timer.wrap("signals", strategy.signal_sell)
+    bot._execute_buy = timer.wrap("execution", bot._execute_buy)
+    bot._execute_sell = timer.wrap("execution", bot._execute_sell)
+    bot._precompute_indicators = timer.wrap("indicators", bot._precompute_indicators)
+    bot.evaluate_performance = timer.wrap("evaluation", bot.evaluate_performance)
+
+    timer.wrap("load", bot.load_backtest_data)()
+    start = time.perf_counter()
+    performance = bot.run_backtest()
+    run_seconds = time.perf_counter() - start
+
+    phases = dict(timer.totals)
+    phases["loop"] = run_seconds - sum(
+        phases.get(phase, 0) for phase in PHASES if phase != "load"
+    )
+    bars = sum(len(df) for df in bot._dataframes.values())
+    return {
+        "symbols": n_symbols,
+        "days": n_days,
+        "bars": bars,
+        "run_seconds": run_seconds,
+        "bars_per_second": bars / run_seconds if run_seconds else 0,
+        "phases": {phase: phases.get(phase, 0.0) for phase in PHASES},
+        "total_trades": performance["total_trades"] if performance else 0,
+    }
+
+
+def measure_peak_memory(n_symbols: int, n_days: int, seed: int = 0) -> int:
+    # Separate pass, tracemalloc slows allocations down too much to time with it
+    tracemalloc.start()
+    try:
+        bot = _build_bot(n_symbols, n_days, seed)
+        bot.backtest()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_report(results: list[dict], baseline: dict = None):
+    header = f"{'symbols':>8} {'days':>6} {'bars/s':>12} {'run s':>8} {'peak MB':>8}"
+    header += "".join(f" {phase:>10}" for phase in PHASES)
+    if baseline:
+        header += f" {'speedup':>8}"
+    print(header)
+    for result in results:
+        line = (
+            f"{result['symbols']:>8} {result['days']:>6} "
+            f"{result['bars_per_second']:>12,.0f} {result['run_seconds']:>8.3f} "
+            f"{(result.get('peak_memory_bytes') or 0) / 2**20:>8.1f}"
+        )
+        line += "".join(f" {result['phases'][phase]:>10.3f}" for phase in PHASES)
+        if baseline:
+            previous = baseline.get((result["symbols"], result["days"]))
+            if previous:
+                line += (
+                    f" {result['bars_per_second'] / previous['bars_per_second']:>7.2f}x"
+                )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TradingBot.backtest")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--days", type=int, nargs="+", default=[250, 1250])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-memory", action="store_true")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--output", help="Results file, defaults to benchmarks/results")
+    args = parser.parse_args()
+
+    results = []
+    for n_symbols in args.symbols:
+        for n_days in args.days:
+            result = run_case(n_symbols, n_days, args.seed)
+            if not args.skip_memory:
+                result["peak_memory_bytes"] = measure_peak_memory(
+                    n_symbols, n_days, args.seed
+                )
+            results.append(result)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {
+                (result["symbols"], result["days"]): result
+                for result in json.load(file)["results"]
+            }
+    _print_report(results, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"backtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "created_at": datetime.now().isoformat(),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+
+def generate_ohlcv(
+    n_symbols: int, n_days: int, seed: int = 0, end_date: date = None
+) -> dict[str, pd.DataFrame]:
+    # Deterministic geometric random walk bars, one frame per symbol
+    rng = np.random.default_rng(seed)
+    end_date = end_date or pd.Timestamp.now().normalize()
+    dates = pd.bdate_range(end=end_date, periods=n_days, name="date")
+
+    frames = {}
+    for index in range(n_symbols):
+        start_price = rng.uniform(20, 500)
+        returns = rng.normal(0.0003, 0.02, n_days)
+        close = start_price * np.exp(np.cumsum(returns))
+        open_ = np.r_[start_price, close[:-1]] * (1 + rng.normal(0, 0.003, n_days))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n_days)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n_days)))
+        volume = rng.lognormal(12, 1, n_days).astype(np.int64)
+        frames[f"SYN{index:04d}"] = pd.DataFrame(
+            {"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+            index=dates,
+        )
+    return frames
+
+
+class InMemoryDB:
+    # Stand-in for database.crud.DB covering what a backtest reads
+    def __init__(
+        self,
+        frames: dict[str, pd.DataFrame],
+        strategy_name: str = "SMA",
+        account_no: str = "BENCH",
+        initial_budget: float = 50000,
+    ):
+        self.frames = frames
+        self.strategy = SimpleNamespace(strategy_id=1, strategy_name=strategy_name)
+        self.account = SimpleNamespace(account_no=account_no, broker="BENCH")
+        self.bot = SimpleNamespace(
+            bot_id=1,
+            bot_name="benchmark",
+            account_no=account_no,
+            strategy_id=1,
+            trade_symbols=list(frames),
+            initial_budget=initial_budget,
+            available_budget=initial_budget,
+            total_profit_loss=0,
+        )
+
+    def get_strategy(self, strategy_name: str):
+        return self.strategy
+
+    def get_account(self, account_no: str):
+        return self.account
+
+    def get_bot_data(self, account_no: str, strategy_id: int):
+        return self.bot
+
+    def _rows(self, symbol: str, start_date=None, end_date=None):
+        df = self.frames.get(symbol)
+        if df is None:
+            return []
+        if start_date is not None:
+            df = df[df.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df.index <= pd.Timestamp(end_date)]
+        return list(
+            zip(
+                [symbol] * len(df),
+                df.index.date,
+                df["open"].tolist(),
+                df["high"].tolist(),
+                df["low"].tolist(),
+                df["close"].tolist(),
+                df["volume"].tolist(),
+            )
+        )
+
+    def get_ohlcv_bulk(self, symbols: list[str], start_date=None, end_date=None):
+        rows = []
+        for symbol in sorted(symbols):
+            rows.extend(self._rows(symbol, start_date, end_date))
+        return rows
+
+    def get_ohlcv_by_symbol(self, symbol: str, start_date=None):
+        columns = ["symbol", "date", "open", "high", "low", "close", "volume"]
+        return [
+            SimpleNamespace(**dict(zip(columns, row)))
+            for row in self._rows(symbol, start_date)
+        ]
+
+    def get_ohlcv_max_dates(self, symbols: list[str]) -> dict:
+        return {
+            symbol: self.frames[symbol].index[-1].date()
+            for symbol in symbols
+            if symbol in self.frames and not self.frames[symbol].empty
+        }
+
+    def get_portfolios_by_account(self, account_no: str):
+        return []
+
+    def get_trades_by_account(self, account_no: str):
+        return []
+
+    def get_last_trade_by_symbol(self, account_no: str, symbol: str):
+        return None
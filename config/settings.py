@@ -8,6 +8,26 @@ class Settings(BaseSettings):
     ACCOUNT_NO: str
     ACCOUNT_BROKER: str
     DISCORD_WEBHOOK_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_READ_RETRIES: int = 3
+    DB_RETRY_BACKOFF_SECONDS: float = 0.5
+    OHLCV_CACHE_DIR: str = "data/ohlcv"
+    OHLCV_HISTORY_YEARS: int = 5
+    BAR_BASE_TIMEFRAME: str = "1m"
+    BAR_CACHE_DIR: str = "data/bars"
+    BAR_HISTORY_DAYS: int = 90
+    ORDER_MAX_CONCURRENCY: int = 8
+    ORDER_TIMEOUT: float = 10
+    REEVALUATION_INTERVAL_MINUTES: float = 0
+    METRICS_ENABLED: bool = False
+    METRICS_PORT: int = 0
+    METRICS_FILE: str = ""
+    METRICS_FILE_INTERVAL_SECONDS: float = 15
+    INDICATOR_CACHE_MB: int = 256
+    INDICATOR_CACHE_SPILL_DIR: str = ""
 
     class Config:
         env_file = ".env"
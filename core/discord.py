@@ -1,8 +1,18 @@
+import atexit
 import json
+import queue
+import threading
+import time
+
 import requests
 
+from core.metrics import metrics
+
 
 class Discord:
+    def __init__(self):
+        self._session = requests.Session()
+
     def send_message_to_discord(self, url, message, file_path=None):
         try:
             headers = {
@@ -13,9 +23,10 @@ class Discord:
             }
             payload_json = json.dumps(payload)
 
-            response = requests.post(url=url, headers=headers, data=payload_json)
+            response = self._session.post(url=url, headers=headers, data=payload_json)
             if file_path:
-                response = requests.post(url=url, files={"file": open(file_path, "rb")})
+                with open(file_path, "rb") as file:
+                    response = self._session.post(url=url, files={"file": file})
             response.raise_for_status()
 
             if response.status_code == 200:
@@ -25,3 +36,124 @@ class Discord:
 
         except requests.exceptions.RequestException as e:
             return {"status": "Error", "message": str(e)}
+
+
+class DiscordNotifier:
+    MAX_MESSAGE_LENGTH = 2000
+
+    def __init__(
+        self,
+        url: str,
+        max_queue_size: int = 1000,
+        max_retries: int = 5,
+        request_timeout: float = 10,
+    ):
+        self.url = url
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._session = requests.Session()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="discord-notifier", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def send(self, message: str) -> bool:
+        # Never blocks the caller, a full queue drops the message instead
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("discord_dropped")
+            return False
+
+    def close(self, timeout: float = 10):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._session.close()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                messages = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            # Everything queued while the last post was in flight goes out together
+            while True:
+                try:
+                    messages.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for content in self._coalesce(messages):
+                self._post(content)
+
+    def _coalesce(self, messages: list[str]) -> list[str]:
+        batches = []
+        current = ""
+        for message in messages:
+            for start in range(0, max(len(message), 1), self.MAX_MESSAGE_LENGTH):
+                chunk = message[start : start + self.MAX_MESSAGE_LENGTH]
+                if current and len(current) + 1 + len(chunk) > self.MAX_MESSAGE_LENGTH:
+                    batches.append(current)
+                    current = chunk
+                else:
+                    current = f"{current}\n{chunk}" if current else chunk
+        if current:
+            batches.append(current)
+        return batches
+
+    def _post(self, content: str) -> bool:
+        delay = 1.0
+        for _ in range(self.max_retries):
+            try:
+                with metrics.timer("discord_post"):
+                    response = self._session.post(
+                        url=self.url,
+                        json={"content": content},
+                        timeout=self.request_timeout,
+                    )
+            except requests.exceptions.RequestException:
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            if response.status_code == 429:
+                time.sleep(self._retry_after(response, delay))
+                delay *= 2
+                continue
+            if response.status_code >= 500:
+                time.sleep(delay)
+                delay *= 2
+                continue
+            return response.ok
+
+        metrics.inc("discord_failed")
+        print(f"Discord message dropped after {self.max_retries} attempts")
+        return False
+
+    @staticmethod
+    def _retry_after(response: requests.Response, default: float) -> float:
+        try:
+            return float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return default
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+import shutil
+from collections import OrderedDict
+from multiprocessing import util
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+from core.metrics import metrics
+from core.strategy import indicators
+
+# Indicator name -> (batch function, input columns passed to it in order)
+INDICATORS = {
+    "sma": (indicators.sma, ["close"]),
+    "rsi": (indicators.rsi, ["close"]),
+    "macd": (indicators.macd, ["close"]),
+    "atr": (indicators.atr, ["high", "low", "close"]),
+}
+
+
+def register_indicator(name: str, func, inputs: list[str]):
+    INDICATORS[name] = (func, inputs)
+
+
+def data_version(data: pd.DataFrame, columns: list[str]) -> tuple:
+    # Last bar plus a digest of the index and input columns, so a revised bar
+    # anywhere in the history gives a new version
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(data.index.values).tobytes())
+    for column in columns:
+        digest.update(np.ascontiguousarray(data[column].to_numpy(float)).tobytes())
+    last_bar = data.index[-1] if len(data) else None
+    return last_bar, digest.hexdigest()
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return int(value.memory_usage(index=True))
+
+
+class IndicatorCache:
+    def __init__(
+        self,
+        max_bytes: int = 256 * 2**20,
+        spill_dir: str = "",
+        max_spill_bytes: int = 2 * 2**30,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._process_dir = None
+        self.max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._spilled = OrderedDict()
+        self._spilled_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+
+    @classmethod
+    def from_settings(cls) -> "IndicatorCache":
+        return cls(
+            max_bytes=settings.INDICATOR_CACHE_MB * 2**20,
+            spill_dir=settings.INDICATOR_CACHE_SPILL_DIR,
+        )
+
+    def compute(self, data: pd.DataFrame, name: str, **params):
+        # Uncached, for one-off frames such as per-bar prefixes whose key would
+        # never be asked for again
+        func, inputs = INDICATORS[name]
+        with metrics.timer(f"indicator_{name}"):
+            return func(*(data[column] for column in inputs), **params)
+
+    def get(self, data: pd.DataFrame, name: str, **params):
+        # The digest identifies the bars, so symbols with the same bars share
+        # entries and frames need no symbol attached
+        _, inputs = INDICATORS[name]
+        key = (name, tuple(sorted(params.items())), data_version(data, inputs))
+
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.inc("indicator_cache_hits")
+            return value
+
+        value = self._load_spilled(key)
+        if value is not None:
+            self.disk_hits += 1
+            metrics.inc("indicator_cache_disk_hits")
+        else:
+            self.misses += 1
+            metrics.inc("indicator_cache_misses")
+            value = self.compute(data, name, **params)
+        self._store(key, value)
+        return value
+
+    def clear(self):
+        for path, _ in self._spilled.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._entries.clear()
+        self._spilled.clear()
+        self._bytes = self._spilled_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "spilled_entries": len(self._spilled),
+            "spilled_bytes": self._spilled_bytes,
+        }
+
+    def _store(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._bytes += size
+        # Least recently used entries go to disk, or are dropped without a spill dir
+        while self._bytes > self.max_bytes:
+            old_key, old_value = self._entries.popitem(last=False)
+            old_size = _nbytes(old_value)
+            self._bytes -= old_size
+            self.evictions += 1
+            if self.spill_dir:
+                self._spill(old_key, old_value, old_size)
+
+    def _process_spill_dir(self) -> str:
+        # Each process spills into its own directory, removed when it exits
+        # (sweep workers included), so spill files don't outlive the run
+        path = os.path.join(self.spill_dir, f"indicators-{os.getpid()}")
+        if path != self._process_dir:
+            os.makedirs(path, exist_ok=True)
+            util.Finalize(
+                None,
+                shutil.rmtree,
+                args=(path,),
+                kwargs={"ignore_errors": True},
+                exitpriority=0,
+            )
+            self._process_dir = path
+        return path
+
+    def _spill_path(self, key) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self._process_spill_dir(), f"{digest}.pkl")
+
+    def _spill(self, key, value, size: int):
+        path = self._spill_path(key)
+        with open(path, "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled[key] = (path, size)
+        self._spilled_bytes += size
+        self.spills += 1
+        while self._spilled_bytes > self.max_spill_bytes:
+            _, (old_path, old_size) = self._spilled.popitem(last=False)
+            self._spilled_bytes -= old_size
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    def _load_spilled(self, key):
+        entry = self._spilled.pop(key, None)
+        if entry is None:
+            return None
+        path, size = entry
+        self._spilled_bytes -= size
+        with open(path, "rb") as file:
+            value = pickle.load(file)
+        os.remove(path)
+        return value
+
+
+indicator_cache = IndicatorCache.from_settings()
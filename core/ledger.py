@@ -0,0 +1,111 @@
+import numpy as np
+
+BUY = 1
+SELL = -1
+SIDES = {"buy": BUY, "sell": SELL}
+
+LEDGER_DTYPE = np.dtype(
+    [
+        ("side", "i1"),
+        ("date", "datetime64[ns]"),
+        ("volume", "f8"),
+        ("price", "f8"),
+        ("commission", "f8"),
+        ("reason", "i2"),
+    ]
+)
+
+
+class TradeLedger:
+    # Fills of one symbol in a growable structured array, about 35 bytes a fill.
+    # Reasons are stored as codes into a small per-ledger vocabulary
+    def __init__(self, capacity: int = 16):
+        self._records = np.empty(capacity, dtype=LEDGER_DTYPE)
+        self._size = 0
+        self.reasons = []
+        self._reason_codes = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records[: self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        # A view, no copy
+        return self._records[name][: self._size]
+
+    def reason_code(self, reason: str) -> int:
+        code = self._reason_codes.get(reason)
+        if code is None:
+            code = self._reason_codes[reason] = len(self.reasons)
+            self.reasons.append(reason)
+        return code
+
+    def reason_labels(self) -> np.ndarray:
+        return np.array(self.reasons, dtype=object)[self.column("reason")]
+
+    def append(
+        self,
+        side: str,
+        date,
+        volume: float,
+        price: float,
+        commission: float = 0.0,
+        reason: str = "unknown",
+    ):
+        self._reserve(self._size + 1)
+        self._records[self._size] = (
+            SIDES[side],
+            date,
+            volume,
+            price,
+            commission,
+            self.reason_code(reason),
+        )
+        self._size += 1
+
+    def extend(
+        self,
+        sides,
+        dates,
+        volumes,
+        prices,
+        commissions=None,
+        reasons=None,
+    ):
+        count = len(volumes)
+        self._reserve(self._size + count)
+        block = self._records[self._size : self._size + count]
+        block["side"] = [SIDES[side] for side in sides]
+        block["date"] = dates
+        block["volume"] = volumes
+        block["price"] = prices
+        block["commission"] = 0.0 if commissions is None else commissions
+        block["reason"] = (
+            self.reason_code("unknown")
+            if reasons is None
+            else [self.reason_code(reason) for reason in reasons]
+        )
+        self._size += count
+
+    def sort_by_date(self):
+        order = np.argsort(self.column("date"), kind="stable")
+        self._records[: self._size] = self.records[order]
+
+    def copy(self) -> "TradeLedger":
+        ledger = TradeLedger(max(len(self._records), 1))
+        ledger._records[: self._size] = self.records
+        ledger._size = self._size
+        ledger.reasons = list(self.reasons)
+        ledger._reason_codes = dict(self._reason_codes)
+        return ledger
+
+    def _reserve(self, size: int):
+        if size <= len(self._records):
+            return
+        capacity = max(size, len(self._records) * 2)
+        records = np.empty(capacity, dtype=LEDGER_DTYPE)
+        records[: self._size] = self.records
+        self._records = records
@@ -0,0 +1,206 @@
+from core.metrics import metrics
+from database.crud import DB, UnitOfWork
+from database.model import Portfolio, SideType, Trade
+
+
+class PositionState:
+    __slots__ = (
+        "portfolio_id",
+        "symbol",
+        "entry_price",
+        "entry_volume",
+        "average_cost",
+        "holding_volume",
+        "profit",
+    )
+
+    def __init__(
+        self,
+        portfolio_id,
+        symbol,
+        entry_price,
+        entry_volume,
+        average_cost,
+        holding_volume,
+        profit,
+    ):
+        self.portfolio_id = portfolio_id
+        self.symbol = symbol
+        self.entry_price = entry_price
+        self.entry_volume = entry_volume
+        self.average_cost = average_cost
+        self.holding_volume = holding_volume
+        self.profit = profit
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Portfolio) -> "PositionState":
+        return cls(
+            portfolio.portfolio_id,
+            portfolio.symbol,
+            portfolio.entry_price,
+            portfolio.entry_volume,
+            portfolio.average_cost,
+            portfolio.holding_volume,
+            portfolio.profit,
+        )
+
+    def copy(self) -> "PositionState":
+        return PositionState(*(getattr(self, name) for name in self.__slots__))
+
+
+class LiveState:
+    # Authoritative positions and budget for live trading, read from the database
+    # once per session and kept current from fills instead of re-queried per decision
+    def __init__(self, account_no: str, bot_id: int, alert=print):
+        self.account_no = account_no
+        self.bot_id = bot_id
+        self.alert = alert
+        self.initial_budget = 0
+        self.available_budget = 0
+        self.total_profit_loss = 0
+        self.positions: dict[str, PositionState] = {}
+        self.last_trade_dates = {}
+
+    def hydrate(self, db: DB, symbols: list[str]):
+        balance = db.get_bot_balance(self.bot_id)
+        self.initial_budget = balance.initial_budget
+        self.available_budget = balance.available_budget
+        self.total_profit_loss = balance.total_profit_loss
+        # Only this bot's symbols, the account may be shared with other bots
+        self.positions = {
+            portfolio.symbol: PositionState.from_portfolio(portfolio)
+            for portfolio in db.get_portfolios_by_account(self.account_no)
+            if portfolio.symbol in symbols
+        }
+        self.last_trade_dates = db.get_last_trade_dates(self.account_no, symbols)
+
+    def holding_volume(self, symbol: str) -> float:
+        position = self.positions.get(symbol)
+        return position.holding_volume if position else 0
+
+    def apply_fill(self, uow: UnitOfWork, trade: Trade):
+        # Writes are staged in the caller's unit of work, memory only changes
+        # once it commits
+        position = self.positions.get(trade.symbol)
+        budget_change, profit_change = self._balance_change(position, trade)
+        balance = self._write_balance(uow, budget_change, profit_change)
+        updated = self._write_position(uow, position, trade)
+
+        def commit():
+            self.available_budget, self.total_profit_loss = balance
+            self.positions[trade.symbol] = updated
+            self.last_trade_dates[trade.symbol] = trade.trade_date
+
+        uow.on_commit(commit)
+
+    @staticmethod
+    def _balance_change(position: PositionState | None, trade: Trade):
+        costs = trade.commission + trade.vat + trade.wht
+        total_cost = trade.price * trade.volume + costs
+        if trade.type == SideType.buy:
+            return -total_cost, 0
+        # Profit uses the position as it was before this trade
+        profit = 0
+        if position:
+            profit = (trade.price - position.average_cost) * trade.volume - costs
+        return total_cost, profit
+
+    @staticmethod
+    def _filled_position(position: PositionState | None, trade: Trade) -> PositionState:
+        costs = trade.commission + trade.vat + trade.wht
+        if position is None:
+            return PositionState(
+                None,
+                trade.symbol,
+                trade.price,
+                trade.volume,
+                (trade.price * trade.volume + costs) / trade.volume,
+                trade.volume,
+                0,
+            )
+
+        position = position.copy()
+        if trade.type == SideType.buy:
+            position.holding_volume += trade.volume
+            position.average_cost = (
+                position.average_cost * (position.holding_volume - trade.volume)
+                + trade.price * trade.volume
+                + costs
+            ) / position.holding_volume
+            position.profit = (
+                trade.price - position.average_cost
+            ) * position.holding_volume
+        else:
+            position.profit += (
+                trade.price * trade.volume
+                - position.average_cost * trade.volume
+                - costs
+            )
+            position.holding_volume -= trade.volume
+            if position.holding_volume == 0:
+                position.average_cost = 0
+            else:
+                position.profit += (
+                    trade.price - position.average_cost
+                ) * position.holding_volume
+        return position
+
+    def _write_balance(
+        self, uow: UnitOfWork, budget_change, profit_change
+    ) -> tuple[float, float]:
+        expected = (self.available_budget, self.total_profit_loss)
+        balance = (expected[0] + budget_change, expected[1] + profit_change)
+        if not uow.update_bot_balance(self.bot_id, expected, balance):
+            # Someone else changed the bot row, apply this fill on top of theirs
+            current = uow.get_bot_balance(self.bot_id)
+            self._conflict(
+                f"Bot {self.bot_id} budget changed outside this process "
+                f"({expected[0]:.2f} -> {current.available_budget:.2f}), reconciling"
+            )
+            balance = (
+                current.available_budget + budget_change,
+                current.total_profit_loss + profit_change,
+            )
+            uow.update_bot_balance(self.bot_id, None, balance)
+        return balance
+
+    def _write_position(
+        self, uow: UnitOfWork, position: PositionState | None, trade: Trade
+    ) -> PositionState:
+        # Compare-and-set on the portfolio row. A row opened, changed or removed
+        # outside this process is read again and the fill applied on top of it
+        while True:
+            updated = self._filled_position(position, trade)
+            if position is None:
+                portfolio = uow.get_portfolio(self.account_no, trade.symbol)
+                if portfolio is None:
+                    portfolio = uow.add_portfolio(
+                        Portfolio(
+                            account_no=self.account_no,
+                            symbol=trade.symbol,
+                            entry_price=updated.entry_price,
+                            entry_volume=updated.entry_volume,
+                            average_cost=updated.average_cost,
+                            holding_volume=updated.holding_volume,
+                            profit=updated.profit,
+                        )
+                    )
+                    updated.portfolio_id = portfolio.portfolio_id
+                    return updated
+            elif uow.update_portfolio_position(
+                position.portfolio_id,
+                (position.holding_volume, position.average_cost),
+                (updated.holding_volume, updated.average_cost, updated.profit),
+            ):
+                return updated
+            else:
+                portfolio = uow.get_portfolio(self.account_no, trade.symbol)
+
+            self._conflict(
+                f"Portfolio for {trade.symbol} changed outside this process, reconciling"
+            )
+            position = PositionState.from_portfolio(portfolio) if portfolio else None
+
+    def _conflict(self, message: str):
+        metrics.inc("state_conflicts")
+        self.alert(message)
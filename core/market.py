@@ -1,9 +1,12 @@
-from datetime import datetime, time, timedelta
+from datetime import datetime
+import pandas as pd
 import pytz
 from config.settings import settings
+from core.market_calendar import MarketCalendar
 from models.market import MarketPhase, PlaceOrder
 from database.model import OrderStatus, Trade, SideType
 import random
+import time as time_module
 
 
 class Market:
@@ -11,29 +14,22 @@ class Market:
         self.bangkok_tz = pytz.timezone("Asia/Bangkok")
         self.market_phases = settings.MARKET_PHASES
         self.holidays = settings.MARKET_HOLIDAYS
+        self.calendar = MarketCalendar.from_settings()
         self.commission_rate = 0.001177
 
     def is_market_open(self, current_time: datetime) -> tuple[bool, MarketPhase]:
         phase = self._get_market_phase(current_time)
-        is_open = current_time.weekday() < 5 and not self._is_holiday(
-            current_time.date()
-        )
+        is_open = self.is_trading_day(current_time.date())
         return is_open, phase
 
-    def _is_holiday(self, check_date) -> bool:
-        return check_date.strftime("%Y-%m-%d") in self.holidays
-
-    def _get_market_phase(self, current_time: datetime) -> str:
-        current_time = current_time.time()
-        for phase, times in self.market_phases.items():
-            start_times = [time.fromisoformat(t) for t in times["start"]]
-            end_time = time.fromisoformat(times["end"])
+    def is_trading_day(self, check_date) -> bool:
+        return self.calendar.is_trading_day(check_date)
 
-            for start_time in start_times:
-                if start_time <= current_time < end_time:
-                    return MarketPhase(phase)
+    def _is_holiday(self, check_date) -> bool:
+        return check_date in self.calendar.holidays
 
-        return "Out of working hours"
+    def _get_market_phase(self, current_time: datetime) -> MarketPhase:
+        return self.calendar.phase(current_time)
 
     def place_order(self, place_order: PlaceOrder) -> Trade:
         success = random.choices([True, False], weights=[90, 10])[0]
@@ -56,16 +52,32 @@ class Market:
         else:
             return None
 
-    @staticmethod
-    def calculate_target_date(date: datetime) -> datetime:
-        input_date = date - timedelta(days=1)
-        for holiday in reversed(settings.MARKET_HOLIDAYS):
-            target_date = input_date.strftime("%Y-%m-%d")
-            if target_date == holiday:
-                input_date = input_date - timedelta(days=1)
-            if input_date.weekday() == 6:
-                input_date = input_date - timedelta(days=2)
-            elif input_date.weekday() == 5:
-                input_date = input_date - timedelta(days=1)
+    def calculate_target_date(self, date: datetime) -> pd.Timestamp:
+        return pd.Timestamp(self.calendar.previous_trading_day(date))
 
-        return input_date
+
+class StubBroker(Market):
+    def __init__(self, latency: float = 0.05, reject_rate: float = 0.1, seed=None):
+        super().__init__()
+        self.latency = latency
+        self.reject_rate = reject_rate
+        self._random = random.Random(seed)
+
+    def place_order(self, place_order: PlaceOrder) -> Trade | None:
+        time_module.sleep(self.latency)
+        if self._random.random() < self.reject_rate:
+            return None
+        return Trade(
+            account_no=place_order.account_no,
+            order_no=f"STUB-{self._random.getrandbits(64):016x}",
+            symbol=place_order.symbol,
+            type=place_order.side,
+            price=place_order.price,
+            volume=place_order.volume,
+            commission=(place_order.price * place_order.volume) * self.commission_rate,
+            vat=0,
+            wht=0,
+            trade_date=datetime.now().date(),
+            trade_time=datetime.now().time(),
+            status=OrderStatus.Matched,
+        )
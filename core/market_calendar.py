@@ -0,0 +1,106 @@
+import bisect
+from datetime import date, datetime, time
+from functools import lru_cache
+
+import numpy as np
+
+from config.settings import settings
+from models.market import MarketPhase
+
+
+class MarketCalendar:
+    WEEKMASK = "1111100"
+
+    def __init__(
+        self,
+        market_phases: dict,
+        holidays: list[str],
+        start: str = "1990-01-01",
+        end: str = "2100-01-01",
+    ):
+        # Phase table as sorted, non-overlapping [start, end) second-of-day intervals
+        intervals = sorted(
+            (self._seconds(time.fromisoformat(start_time)), phase, times["end"])
+            for phase, times in market_phases.items()
+            for start_time in times["start"]
+        )
+        self._phase_starts = np.array([interval[0] for interval in intervals])
+        self._phase_ends = np.array(
+            [self._seconds(time.fromisoformat(interval[2])) for interval in intervals]
+        )
+        self._phase_values = [MarketPhase(interval[1]) for interval in intervals]
+        self.transitions = self._build_transitions(intervals)
+
+        self.holidays = {date.fromisoformat(holiday) for holiday in holidays}
+        self._busdaycal = np.busdaycalendar(
+            weekmask=self.WEEKMASK,
+            holidays=np.array(sorted(self.holidays), dtype="datetime64[D]"),
+        )
+        all_days = np.arange(start, end, dtype="datetime64[D]")
+        self.trading_days = all_days[np.is_busday(all_days, busdaycal=self._busdaycal)]
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def from_settings(cls) -> "MarketCalendar":
+        return cls(settings.MARKET_PHASES, settings.MARKET_HOLIDAYS)
+
+    @staticmethod
+    def _seconds(at: time) -> int:
+        return at.hour * 3600 + at.minute * 60 + at.second
+
+    def _build_transitions(self, intervals) -> list[tuple[time, MarketPhase]]:
+        transitions = {}
+        for start, phase, _ in intervals:
+            transitions[start] = MarketPhase(phase)
+        for end in self._phase_ends:
+            transitions.setdefault(int(end), MarketPhase.OutOfWorkingHours)
+        return [
+            (time(seconds // 3600, seconds // 60 % 60, seconds % 60), phase)
+            for seconds, phase in sorted(transitions.items())
+        ]
+
+    def phase(self, at: datetime | time) -> MarketPhase:
+        if isinstance(at, datetime):
+            at = at.time()
+        seconds = self._seconds(at)
+        index = bisect.bisect_right(self._phase_starts, seconds) - 1
+        if index >= 0 and seconds < self._phase_ends[index]:
+            return self._phase_values[index]
+        return MarketPhase.OutOfWorkingHours
+
+    def phases(self, seconds_of_day: np.ndarray) -> np.ndarray:
+        seconds_of_day = np.asarray(seconds_of_day)
+        index = np.searchsorted(self._phase_starts, seconds_of_day, side="right") - 1
+        inside = (index >= 0) & (
+            seconds_of_day < self._phase_ends[np.clip(index, 0, None)]
+        )
+        values = np.array(self._phase_values + [MarketPhase.OutOfWorkingHours])
+        return values[np.where(inside, index, -1)]
+
+    def is_trading_day(self, day: date) -> bool:
+        return bool(np.is_busday(np.datetime64(day, "D"), busdaycal=self._busdaycal))
+
+    def is_trading_days(self, days) -> np.ndarray:
+        return np.is_busday(
+            np.asarray(days, dtype="datetime64[D]"), busdaycal=self._busdaycal
+        )
+
+    def previous_trading_day(self, day: date) -> date:
+        return self.previous_trading_days(np.datetime64(day, "D")).astype(object)
+
+    def previous_trading_days(self, days) -> np.ndarray:
+        days = np.asarray(days, dtype="datetime64[D]")
+        return np.busday_offset(days - 1, 0, roll="backward", busdaycal=self._busdaycal)
+
+    def next_trading_day(self, day: date) -> date:
+        return np.busday_offset(
+            np.datetime64(day, "D") + 1, 0, roll="forward", busdaycal=self._busdaycal
+        ).astype(object)
+
+    def trading_days_between(self, start: date, end: date) -> np.ndarray:
+        # Inclusive range, a view into the precomputed array
+        left = np.searchsorted(self.trading_days, np.datetime64(start, "D"))
+        right = np.searchsorted(
+            self.trading_days, np.datetime64(end, "D"), side="right"
+        )
+        return self.trading_days[left:right]
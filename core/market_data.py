@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+from core.metrics import metrics
+from core.resample import DAILY, check_timeframe, resample
+from core.strategy import BaseStrategy
+from database.crud import DB
+from database.ohlcv_cache import (
+    BarCache,
+    OHLCVCache,
+    fetch_bars,
+    split_by_symbol,
+    to_frame,
+)
+
+
+@metrics.timed("ohlcv_load")
+def load_ohlcv(
+    db: DB,
+    ohlcv_cache: OHLCVCache | None,
+    stocks: list[str],
+    timeframe: str = DAILY,
+    bar_cache: BarCache | None = None,
+    history_start: date = None,
+) -> dict[str, pd.DataFrame]:
+    if timeframe != DAILY:
+        return load_bars(db, bar_cache, stocks, timeframe)
+
+    # First day kept, OHLCV_HISTORY_YEARS back unless the caller needs more
+    if history_start is None:
+        history_start = (
+            pd.Timestamp.now() - pd.DateOffset(years=settings.OHLCV_HISTORY_YEARS)
+        ).date() + timedelta(days=1)
+    if ohlcv_cache is None:
+        records = split_by_symbol(db.get_ohlcv_bulk(stocks, start_date=history_start))
+    else:
+        records = ohlcv_cache.sync(db, stocks)
+
+    dataframes = {}
+    for stock in stocks:
+        stock_records = records.get(stock)
+        if stock_records is None or not len(stock_records):
+            print(f"Warning: No data found for stock {stock}.")
+            dataframes[stock] = pd.DataFrame()
+            continue
+        start = np.searchsorted(stock_records["date"], np.datetime64(history_start))
+        dataframes[stock] = to_frame(stock_records[start:])
+    return dataframes
+
+
+def load_bars(
+    db: DB, bar_cache: BarCache | None, stocks: list[str], timeframe: str
+) -> dict[str, pd.DataFrame]:
+    # Intraday bars from the bar store at the base resolution, resampled up to
+    # the requested timeframe. History is limited to BAR_HISTORY_DAYS
+    base_timeframe = settings.BAR_BASE_TIMEFRAME
+    check_timeframe(timeframe, base_timeframe)
+    history_start = pd.Timestamp.now().normalize() - pd.Timedelta(
+        days=settings.BAR_HISTORY_DAYS
+    )
+    if bar_cache is None:
+        records = fetch_bars(db, stocks, start=history_start)
+    else:
+        records = bar_cache.sync(db, stocks)
+
+    dataframes = {}
+    for stock in stocks:
+        stock_records = records.get(stock)
+        if stock_records is None or not len(stock_records):
+            print(f"Warning: No {base_timeframe} bars found for stock {stock}.")
+            dataframes[stock] = pd.DataFrame()
+            continue
+        start = np.searchsorted(stock_records["date"], history_start.to_datetime64())
+        df = to_frame(stock_records[start:])
+        if timeframe != base_timeframe:
+            df = resample(df, timeframe)
+        dataframes[stock] = df
+    return dataframes
+
+
+class MarketData:
+    # OHLCV and indicators shared by every bot in a process. Frames are loaded
+    # once for the union of symbols and handed out without copying, indicators
+    # are computed once per strategy instance and symbol
+    def __init__(
+        self,
+        db: DB,
+        ohlcv_cache: OHLCVCache | None = None,
+        timeframe: str = DAILY,
+        bar_cache: BarCache | None = None,
+    ):
+        self._db = db
+        self._ohlcv_cache = ohlcv_cache
+        self.timeframe = timeframe
+        self._bar_cache = bar_cache
+        self.dataframes = {}
+        self._indicator_frames = {}
+
+    def load(self, symbols: list[str]):
+        self.dataframes = load_ohlcv(
+            self._db,
+            self._ohlcv_cache,
+            list(symbols),
+            self.timeframe,
+            self._bar_cache,
+        )
+        self._indicator_frames = {}
+
+    def frames(self, symbols: list[str]) -> dict[str, pd.DataFrame]:
+        return {
+            symbol: self.dataframes.get(symbol, pd.DataFrame()) for symbol in symbols
+        }
+
+    def indicator_frames(
+        self, strategy: BaseStrategy, dataframes: dict[str, pd.DataFrame]
+    ) -> dict[str, pd.DataFrame]:
+        frames = {}
+        for symbol, df in dataframes.items():
+            if df.empty:
+                continue
+            key = (strategy, symbol)
+            if key not in self._indicator_frames:
+                self._indicator_frames[key] = strategy.calculate_indicators(df.copy())
+            frames[symbol] = self._indicator_frames[key]
+        return frames
@@ -0,0 +1,231 @@
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.settings import settings
+
+_NULL_TIMER = nullcontext()
+
+
+class TimerStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    PREFIX = "trading_bot"
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._timers = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str):
+        # Disabled timers are a shared no-op context, no clock reads or locking
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = TimerStats()
+            stats.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def gauge(self, name: str, read):
+        # Read on every snapshot rather than updated, so it costs nothing between
+        # scrapes. Gauges stay registered across resets
+        with self._lock:
+            self._gauges[name] = read
+
+    def reset(self):
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            gauges = sorted(self._gauges.items()) if self.enabled else []
+            snapshot = {
+                "timers": {
+                    name: {"count": stats.count, "total": stats.total, "max": stats.max}
+                    for name, stats in sorted(self._timers.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+        snapshot["gauges"] = {name: read() for name, read in gauges}
+        return snapshot
+
+    def report(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for name, stats in snapshot["timers"].items():
+            mean = stats["total"] / stats["count"] if stats["count"] else 0
+            lines.append(
+                f"{name}: {stats['count']} calls, {stats['total']:.3f}s total, "
+                f"{mean * 1000:.3f}ms mean, {stats['max'] * 1000:.3f}ms max"
+            )
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name}: {value:g}")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"{name}: {value:g}")
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for name, stats in snapshot["timers"].items():
+            metric = f"{self.PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_count {stats['count']}")
+            lines.append(f"{metric}_sum {stats['total']!r}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            lines.append(f"{metric}_max {stats['max']!r}")
+        for name, value in snapshot["counters"].items():
+            metric = f"{self.PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value!r}")
+        for name, value in snapshot["gauges"].items():
+            metric = f"{self.PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    def __init__(
+        self,
+        registry: Metrics,
+        port: int = 0,
+        file_path: str = "",
+        interval: float = 15,
+    ):
+        self.registry = registry
+        self.port = port
+        self.file_path = file_path
+        self.interval = interval
+        self._server = None
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads or not self.registry.enabled:
+            return
+        self._stop.clear()
+        if self.port:
+            self._server = ThreadingHTTPServer(
+                ("127.0.0.1", self.port), self._handler()
+            )
+            self._start_thread("metrics-http", self._server.serve_forever)
+        if self.file_path:
+            self._start_thread("metrics-file", self._write_periodically)
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        # Last write so the file reflects the whole session
+        if self.file_path and self.registry.enabled:
+            self.write_file()
+
+    def write_file(self):
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(self.registry.render_prometheus())
+        os.replace(tmp_path, self.file_path)
+
+    def _start_thread(self, name: str, target):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _write_periodically(self):
+        while not self._stop.wait(self.interval):
+            self.write_file()
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+metrics = Metrics(settings.METRICS_ENABLED)
@@ -0,0 +1,224 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.ledger import TradeLedger
+from core.performance import match_lots
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def _trade_paths(
+    lots: np.ndarray,
+    n_paths: int,
+    rng: np.random.Generator,
+    slippage: float,
+    replace: bool,
+) -> np.ndarray:
+    # Each row is one reordering of the round trips, drawn with replacement or
+    # as a shuffle. Slippage moves every fill against the trade by a
+    # half-normal fraction of its price
+    count = len(lots)
+    if replace:
+        order = rng.integers(0, count, (n_paths, count))
+    else:
+        order = rng.permuted(np.tile(np.arange(count), (n_paths, 1)), axis=1)
+    cost = lots[order, 0]
+    proceeds = lots[order, 1]
+    if slippage:
+        cost *= 1 + np.abs(rng.normal(0.0, slippage, cost.shape))
+        proceeds *= 1 - np.abs(rng.normal(0.0, slippage, proceeds.shape))
+    return proceeds - cost
+
+
+def _return_paths(
+    returns: np.ndarray, n_paths: int, rng: np.random.Generator, block_size: int
+) -> np.ndarray:
+    # Moving block bootstrap, blocks of consecutive days keep short-range
+    # autocorrelation and volatility clustering
+    count = len(returns)
+    block_size = max(1, min(block_size, count))
+    n_blocks = math.ceil(count / block_size)
+    starts = rng.integers(0, count - block_size + 1, (n_paths, n_blocks))
+    index = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)
+    return returns[index[:, :count]]
+
+
+def _path_stats(
+    equity: np.ndarray, initial_budget: float, ruin_level: float
+) -> np.ndarray:
+    # Max drawdown %, ROI % and whether equity fell to the ruin level, per path
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_budget)
+    max_drawdown = (equity / peak - 1).min(axis=1) * 100
+    roi = (equity[:, -1] / initial_budget - 1) * 100
+    ruined = (equity <= initial_budget * ruin_level).any(axis=1)
+    return np.column_stack([max_drawdown, roi, ruined])
+
+
+def _simulate_chunk(args) -> np.ndarray:
+    kind, data, n_paths, seed, initial_budget, ruin_level, options = args
+    rng = np.random.default_rng(seed)
+    if kind == "trades":
+        pnl = _trade_paths(data, n_paths, rng, **options)
+        equity = initial_budget + pnl.cumsum(axis=1)
+    else:
+        returns = _return_paths(data, n_paths, rng, **options)
+        equity = initial_budget * np.cumprod(1 + returns, axis=1)
+    return _path_stats(equity, initial_budget, ruin_level)
+
+
+def _simulate(
+    kind: str,
+    data: np.ndarray,
+    initial_budget: float,
+    n_paths: int,
+    ruin_level: float,
+    seed,
+    max_workers: int,
+    chunk_size: int,
+    options: dict,
+) -> pd.DataFrame:
+    # Paths are split into chunks with independent seeds, so results do not
+    # depend on how many workers ran them
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [
+        (kind, data, size, chunk_seed, initial_budget, ruin_level, options)
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_simulate_chunk, chunks))
+    else:
+        results = [_simulate_chunk(chunk) for chunk in chunks]
+
+    stats = np.concatenate(results)
+    return pd.DataFrame(
+        {
+            "max_drawdown": stats[:, 0],
+            "roi": stats[:, 1],
+            "ruined": stats[:, 2].astype(bool),
+        }
+    )
+
+
+def summarize(paths: pd.DataFrame) -> dict:
+    summary = {"paths": len(paths)}
+    for column in ["roi", "max_drawdown"]:
+        values = paths[column].to_numpy()
+        summary[column] = {
+            "mean": float(values.mean()),
+            **{
+                f"p{q}": float(value)
+                for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+            },
+        }
+    summary["risk_of_ruin"] = float(paths["ruined"].mean() * 100)
+    return summary
+
+
+def simulate_trades(
+    ledgers: dict[str, TradeLedger],
+    initial_budget: float,
+    n_paths: int = 10000,
+    slippage: float = 0.0,
+    replace: bool = True,
+    ruin_level: float = 0.5,
+    seed=None,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    lots = np.concatenate(
+        [np.empty((0, 2))] + [match_lots(ledger) for ledger in ledgers.values()]
+    )
+    if not len(lots):
+        return pd.DataFrame(columns=["max_drawdown", "roi", "ruined"])
+    return _simulate(
+        "trades",
+        lots,
+        initial_budget,
+        n_paths,
+        ruin_level,
+        seed,
+        max_workers,
+        chunk_size,
+        {"slippage": slippage, "replace": replace},
+    )
+
+
+def simulate_returns(
+    equity: pd.Series,
+    initial_budget: float,
+    n_paths: int = 10000,
+    block_size: int = 20,
+    ruin_level: float = 0.5,
+    seed=None,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    returns = equity.pct_change().dropna().to_numpy(float)
+    if not len(returns):
+        return pd.DataFrame(columns=["max_drawdown", "roi", "ruined"])
+    return _simulate(
+        "returns",
+        returns,
+        initial_budget,
+        n_paths,
+        ruin_level,
+        seed,
+        max_workers,
+        chunk_size,
+        {"block_size": block_size},
+    )
+
+
+def run_monte_carlo(
+    ledgers: dict[str, TradeLedger],
+    equity_curve: pd.DataFrame,
+    initial_budget: float,
+    n_paths: int = 10000,
+    slippage: float = 0.0,
+    block_size: int = 20,
+    ruin_level: float = 0.5,
+    seed=None,
+    max_workers: int = None,
+) -> dict:
+    options = {
+        "n_paths": n_paths,
+        "ruin_level": ruin_level,
+        "seed": seed,
+        "max_workers": max_workers,
+    }
+    results = {}
+    trades = simulate_trades(ledgers, initial_budget, slippage=slippage, **options)
+    if not trades.empty:
+        results["trades"] = summarize(trades)
+    if equity_curve is not None:
+        returns = simulate_returns(
+            equity_curve["equity"], initial_budget, block_size=block_size, **options
+        )
+        if not returns.empty:
+            results["returns"] = summarize(returns)
+    return results
+
+
+def print_monte_carlo(results: dict):
+    titles = {
+        "trades": "Trade order bootstrap",
+        "returns": "Daily return block bootstrap",
+    }
+    for kind, summary in results.items():
+        print(f"{titles[kind]} ({summary['paths']} paths):")
+        for column in ["roi", "max_drawdown"]:
+            values = ", ".join(
+                f"{key}: {value:.2f}" for key, value in summary[column].items()
+            )
+            print(f"  {column}: {values}")
+        print(f"  risk_of_ruin: {summary['risk_of_ruin']:.2f}%")
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from config.settings import settings
+from core.discord import DiscordNotifier
+from core.market import Market
+from core.market_data import MarketData
+from core.metrics import MetricsExporter, metrics
+from core.scheduler import MarketScheduler
+from core.strategy import BaseStrategy
+from core.trading_bot import TradingBot
+from database.crud import DB
+from database.ohlcv_cache import OHLCVCache
+from models.market import MarketPhase
+from models.trading_bot import TradingMode
+
+
+class BotOrchestrator:
+    def __init__(
+        self,
+        strategies: dict[str, type[BaseStrategy]],
+        mode: TradingMode,
+        verbose: bool = True,
+        db: DB = None,
+    ):
+        self._db = db or DB()
+        self._mode = mode
+        self._verbose = verbose
+        self._notifier = DiscordNotifier(settings.DISCORD_WEBHOOK_URL)
+        self._metrics_exporter = MetricsExporter(
+            metrics,
+            port=settings.METRICS_PORT,
+            file_path=settings.METRICS_FILE,
+            interval=settings.METRICS_FILE_INTERVAL_SECONDS,
+        )
+        self._market_data = MarketData(
+            self._db,
+            OHLCVCache(settings.OHLCV_CACHE_DIR) if settings.OHLCV_CACHE_DIR else None,
+        )
+        self._bots = self._discover_bots(strategies)
+        print(f"{len(self._bots)} bots trading {len(self.symbols())} symbols")
+
+    def _discover_bots(
+        self, strategies: dict[str, type[BaseStrategy]]
+    ) -> dict[str, TradingBot]:
+        # Bots running the same strategy share one instance, and with it the
+        # indicator frames of their common symbols in backtests
+        shared_strategies = {}
+        bots = {}
+        symbol_owners = {}
+        for bot_info in self._db.get_bots_by_account(settings.ACCOUNT_NO):
+            strategy_name = bot_info.strategy.strategy_name
+            strategy_class = strategies.get(strategy_name)
+            if strategy_class is None:
+                print(
+                    f"Warning: No strategy registered for '{strategy_name}', "
+                    f"skipping bot {bot_info.bot_name}."
+                )
+                continue
+            # Live portfolio rows are per account and symbol, so two live bots
+            # trading the same symbol would adopt and sell each other's holdings.
+            # Backtests keep their own ledgers and may overlap
+            shared = sorted(set(bot_info.trade_symbols) & symbol_owners.keys())
+            if shared and self._mode == TradingMode.Live:
+                owners = sorted({symbol_owners[symbol] for symbol in shared})
+                raise ValueError(
+                    f"Bot {bot_info.bot_name} trades {', '.join(shared)}, already "
+                    f"traded by {', '.join(owners)} on account {settings.ACCOUNT_NO}"
+                )
+            symbol_owners.update(
+                {symbol: bot_info.bot_name for symbol in bot_info.trade_symbols}
+            )
+            if strategy_name not in shared_strategies:
+                shared_strategies[strategy_name] = strategy_class()
+            bots[bot_info.bot_name] = TradingBot(
+                strategy_class,
+                self._mode,
+                verbose=self._verbose,
+                db=self._db,
+                bot_info=bot_info,
+                strategy=shared_strategies[strategy_name],
+                market_data=self._market_data,
+                notifier=self._notifier,
+            )
+        return bots
+
+    def symbols(self) -> list[str]:
+        return sorted(
+            {symbol for bot in self._bots.values() for symbol in bot.trade_symbols}
+        )
+
+    def backtest(self, start_date=None, end_date=None) -> dict[str, dict]:
+        self._market_data.load(self.symbols())
+        results = {}
+        for name, bot in self._bots.items():
+            bot.load_backtest_data()
+            results[name] = bot.run_backtest(start_date, end_date)
+        return results
+
+    def live_trading(self, scheduler: MarketScheduler = None):
+        self._notifier.start()
+        self._metrics_exporter.start()
+        scheduler = scheduler or MarketScheduler(Market())
+        # Registered before the bots' handlers, so data is reloaded once per
+        # day before any bot reads it
+        scheduler.on_phase(MarketPhase.PreOpen, self._on_pre_open)
+        self._market_data.load(self.symbols())
+        for bot in self._bots.values():
+            bot.prepare_live_session(scheduler)
+        try:
+            scheduler.run()
+        finally:
+            self._notifier.close()
+            self._metrics_exporter.close()
+            for bot in self._bots.values():
+                bot.close()
+
+    def _on_pre_open(self, current_datetime: datetime):
+        self._market_data.load(self.symbols())
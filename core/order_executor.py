@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core.market import Market
+from core.metrics import metrics
+from database.model import Trade
+from models.market import PlaceOrder
+
+
+class UnresolvedOrder:
+    # An order whose broker call outlived the timeout. The broker may still
+    # fill it, so it is neither resent nor treated as rejected, its outcome is
+    # known once the call returns
+    __slots__ = ("order", "future")
+
+    def __init__(self, order: PlaceOrder, future: Future):
+        self.order = order
+        self.future = future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Trade | None:
+        if self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+
+class _Slots:
+    # Broker threads free for one batch. A send that times out keeps its
+    # thread, so its slot is lost instead of released
+    def __init__(self, free: int):
+        self.free = free
+        self.busy = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> bool:
+        # False once every slot is lost, instead of waiting forever
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.free > 0 or self.busy == 0)
+            if self.free == 0:
+                return False
+            self.free -= 1
+            self.busy += 1
+            return True
+
+    async def release(self, lost: bool = False):
+        async with self._changed:
+            self.busy -= 1
+            if not lost:
+                self.free += 1
+            self._changed.notify_all()
+
+
+class AsyncOrderExecutor:
+    def __init__(
+        self,
+        market: Market,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        order_timeout: float = 10,
+        retry_delay: float = 1,
+        alert=print,
+    ):
+        self.market = market
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.order_timeout = order_timeout
+        self.retry_delay = retry_delay
+        self.alert = alert
+        self.last_sent_at = None
+        # Broker calls run on threads owned by the executor, not the loop's
+        # default executor, so asyncio.run doesn't wait on a call that timed out
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="order"
+        )
+        # Timed out calls still holding a pool thread, across batches
+        self._stuck = 0
+        self._stuck_lock = threading.Lock()
+
+    @property
+    def stuck(self) -> int:
+        with self._stuck_lock:
+            return self._stuck
+
+    def run(self, orders: list[PlaceOrder]) -> list[Trade | UnresolvedOrder | None]:
+        return asyncio.run(self.place_orders(orders))
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def place_orders(
+        self, orders: list[PlaceOrder]
+    ) -> list[Trade | UnresolvedOrder | None]:
+        # Only threads not held by a timed out call are handed out, so an order
+        # never queues inside the pool behind a hung one
+        slots = _Slots(self.max_concurrency - self.stuck)
+        return await asyncio.gather(
+            *(self._place_order(slots, order) for order in orders)
+        )
+
+    async def _place_order(
+        self, slots: _Slots, order: PlaceOrder
+    ) -> Trade | UnresolvedOrder | None:
+        if not await slots.acquire():
+            metrics.inc("orders_not_sent")
+            self.alert(
+                f"Order for {order.symbol} not sent, every broker thread is held by a timed out call"
+            )
+            return None
+
+        lost = False
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                self.last_sent_at = time.monotonic()
+                future = self._pool.submit(self._send, order)
+                try:
+                    trade_result = await asyncio.wait_for(
+                        asyncio.wrap_future(future), timeout=self.order_timeout
+                    )
+                except asyncio.TimeoutError:
+                    metrics.inc("order_timeouts")
+                    lost = True
+                    self._hold(future)
+                    self.alert(
+                        f"Order placement for {order.symbol} timed out after {self.order_timeout}s, awaiting the broker's answer"
+                    )
+                    return UnresolvedOrder(order, future)
+
+                if trade_result:
+                    metrics.inc("orders_filled")
+                    return trade_result
+                if attempt < self.max_retries:
+                    metrics.inc("order_retries")
+                    self.alert(
+                        f"Retrying order placement for {order.symbol} (Attempt {attempt + 1}/{self.max_retries})"
+                    )
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+            metrics.inc("orders_failed")
+            self.alert(
+                f"Order placement failed after {self.max_retries} attempts for {order.symbol}"
+            )
+            return None
+        finally:
+            await slots.release(lost)
+
+    def _hold(self, future: Future):
+        with self._stuck_lock:
+            self._stuck += 1
+        future.add_done_callback(self._unhold)
+
+    def _unhold(self, _):
+        with self._stuck_lock:
+            self._stuck -= 1
+
+    def _send(self, order: PlaceOrder) -> Trade | None:
+        with metrics.timer("order_place"):
+            return self.market.place_order(order)
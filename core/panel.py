@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+class PanelSlice:
+    def __init__(self, panel: "Panel", time_index: int):
+        self.panel = panel
+        self.time_index = time_index
+        self.timestamp = pd.Timestamp(panel.timestamps[time_index])
+        self.symbols = panel.symbols
+        self.fields = panel.fields
+        # (symbol, field) values and (symbol,) validity at time t, both views
+        self.values = panel.values[:, time_index, :]
+        self.mask = panel.mask[:, time_index]
+
+    def field(self, name: str) -> np.ndarray:
+        return self.values[:, self.panel.field_index[name]]
+
+    def history(self, name: str, length: int) -> np.ndarray:
+        # (symbol, length) window ending at t, shorter at the start of the panel
+        start = max(0, self.time_index - length + 1)
+        return self.panel.values[
+            :, start : self.time_index + 1, self.panel.field_index[name]
+        ]
+
+
+class Panel:
+    def __init__(
+        self,
+        symbols: list[str],
+        timestamps: np.ndarray,
+        fields: list[str],
+        values: np.ndarray,
+        mask: np.ndarray,
+    ):
+        self.symbols = symbols
+        self.timestamps = timestamps
+        self.fields = fields
+        self.field_index = {field: index for index, field in enumerate(fields)}
+        self.values = values
+        self.mask = mask
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, pd.DataFrame], fields: list[str] = None):
+        frames = {symbol: df for symbol, df in frames.items() if not df.empty}
+        symbols = list(frames)
+        if fields is None:
+            fields = (
+                list(frames[symbols[0]].select_dtypes("number").columns)
+                if symbols
+                else []
+            )
+        timestamps = (
+            np.unique(np.concatenate([df.index.values for df in frames.values()]))
+            if symbols
+            else np.empty(0, dtype="datetime64[ns]")
+        )
+
+        # Contiguous symbol x time x field block, NaN where a symbol has no bar
+        values = np.full((len(symbols), len(timestamps), len(fields)), np.nan)
+        mask = np.zeros((len(symbols), len(timestamps)), dtype=bool)
+        for index, df in enumerate(frames.values()):
+            positions = np.searchsorted(timestamps, df.index.values)
+            values[index, positions, :] = df[fields].to_numpy(dtype=float)
+            mask[index, positions] = True
+        return cls(symbols, timestamps, fields, values, mask)
+
+    def time_index(self, timestamp) -> int | None:
+        timestamp = np.datetime64(pd.Timestamp(timestamp))
+        index = int(np.searchsorted(self.timestamps, timestamp))
+        if index < len(self.timestamps) and self.timestamps[index] == timestamp:
+            return index
+        return None
+
+    def at(self, time_index: int) -> PanelSlice:
+        return PanelSlice(self, time_index)
+
+    def field(self, name: str) -> np.ndarray:
+        return self.values[:, :, self.field_index[name]]
@@ -0,0 +1,139 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from core.ledger import BUY, TradeLedger
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def match_lots(ledger: TradeLedger) -> np.ndarray:
+    # One pass over the fills in date order, each sell closes the oldest open
+    # lots first and yields the cost and net proceeds of that round trip,
+    # commissions included. Sells without open lots are ignored
+    records = ledger.records[np.argsort(ledger.column("date"), kind="stable")]
+    lots = deque()
+    round_trips = []
+    for side, volume, price, commission in zip(
+        records["side"].tolist(),
+        records["volume"].tolist(),
+        records["price"].tolist(),
+        records["commission"].tolist(),
+    ):
+        if volume <= 0:
+            continue
+        if side == BUY:
+            lots.append([volume, price + commission / volume])
+            continue
+
+        remaining = volume
+        cost = 0.0
+        while remaining > 0 and lots:
+            lot = lots[0]
+            matched = min(remaining, lot[0])
+            cost += matched * lot[1]
+            remaining -= matched
+            lot[0] -= matched
+            if lot[0] == 0:
+                lots.popleft()
+
+        matched_volume = volume - remaining
+        if matched_volume > 0:
+            round_trips.append((cost, matched_volume * (price - commission / volume)))
+    return np.array(round_trips, dtype=float).reshape(-1, 2)
+
+
+def match_fifo(ledger: TradeLedger) -> np.ndarray:
+    # Net P&L of each round trip
+    lots = match_lots(ledger)
+    return lots[:, 1] - lots[:, 0]
+
+
+def equity_curve(
+    ledgers: dict[str, TradeLedger],
+    closes: pd.DataFrame,
+    initial_budget: float,
+) -> tuple[pd.Series, pd.Series, float]:
+    # Daily equity marked to close, plus gross position value and traded notional
+    bar_days = closes.index.values.astype("datetime64[D]")
+    holdings = np.zeros(closes.shape)
+    cash_flow = np.zeros(len(closes))
+    traded_notional = 0.0
+    for column, symbol in enumerate(closes.columns):
+        ledger = ledgers.get(symbol)
+        if not ledger:
+            continue
+        # Each fill is booked on the last bar at or before its day, fills from
+        # outside the bars' days are left out
+        fill_days = ledger.column("date").astype("datetime64[D]")
+        day = np.searchsorted(bar_days, fill_days, side="right") - 1
+        inside = (day >= 0) & (fill_days <= bar_days[-1])
+        fills = ledger.records[inside]
+        day = day[inside]
+        volume = fills["volume"]
+        price = fills["price"]
+        signed_volume = fills["side"] * volume
+        np.add.at(holdings[:, column], day, signed_volume)
+        np.add.at(cash_flow, day, -signed_volume * price - fills["commission"])
+        traded_notional += float(volume @ price)
+
+    holdings = holdings.cumsum(axis=0)
+    cash = initial_budget + cash_flow.cumsum()
+    position_value = np.nan_to_num(holdings * closes.values)
+    equity = pd.Series(cash + position_value.sum(axis=1), index=closes.index)
+    gross = pd.Series(np.abs(position_value).sum(axis=1), index=closes.index)
+    return equity, gross, traded_notional
+
+
+def risk_metrics(equity: pd.Series, gross: pd.Series, traded_notional: float) -> dict:
+    returns = equity.pct_change().dropna().values
+    annualization = np.sqrt(TRADING_DAYS_PER_YEAR)
+    sharpe = sortino = 0.0
+    if len(returns) > 1 and returns.std(ddof=1) > 0:
+        sharpe = returns.mean() / returns.std(ddof=1) * annualization
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else 0
+    if downside > 0:
+        sortino = returns.mean() / downside * annualization
+
+    values = equity.values
+    drawdown = values / np.maximum.accumulate(values) - 1 if len(values) else [0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exposure = np.nan_to_num(gross.values / values)
+    return {
+        "sharpe_ratio": float(sharpe),
+        "sortino_ratio": float(sortino),
+        "max_drawdown": float(np.min(drawdown) * 100),
+        "exposure": float(exposure.mean() * 100) if len(exposure) else 0.0,
+        "turnover": float(traded_notional / values.mean()) if len(values) else 0.0,
+    }
+
+
+def evaluate(
+    ledgers: dict[str, TradeLedger],
+    closes: pd.DataFrame,
+    initial_budget: float,
+) -> tuple[dict, pd.DataFrame]:
+    round_trips = np.concatenate(
+        [np.empty(0)] + [match_fifo(ledger) for ledger in ledgers.values()]
+    )
+    total_profit_loss = float(round_trips.sum())
+    total_trades = len(round_trips)
+    win_rate = (
+        float((round_trips > 0).sum() / total_trades * 100) if total_trades else 0
+    )
+    performance = {
+        "total_profit_loss": total_profit_loss,
+        "total_trades": total_trades,
+        "win_rate": win_rate,
+        "roi": total_profit_loss / initial_budget * 100,
+    }
+
+    if closes.empty:
+        equity = pd.Series(dtype=float)
+        gross = pd.Series(dtype=float)
+        traded_notional = 0.0
+    else:
+        equity, gross, traded_notional = equity_curve(ledgers, closes, initial_budget)
+    performance.update(risk_metrics(equity, gross, traded_notional))
+    return performance, pd.DataFrame({"equity": equity, "gross": gross})
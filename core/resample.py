@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from core.indicator_cache import indicator_cache, register_indicator
+
+DAILY = "1d"
+TIMEFRAMES = {
+    "1m": "1min",
+    "5m": "5min",
+    "15m": "15min",
+    "30m": "30min",
+    "1h": "1h",
+    "1d": "1D",
+}
+
+
+def timeframe_delta(timeframe: str) -> pd.Timedelta:
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(
+            f"Unknown timeframe {timeframe}, expected one of {list(TIMEFRAMES)}"
+        )
+    return pd.Timedelta(TIMEFRAMES[timeframe])
+
+
+def check_timeframe(timeframe: str, base_timeframe: str):
+    if timeframe_delta(timeframe) % timeframe_delta(base_timeframe):
+        raise ValueError(
+            f"{timeframe} bars can't be built from {base_timeframe} base bars"
+        )
+
+
+def resample_ohlcv(
+    open: pd.Series,
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+    volume: pd.Series,
+    timeframe: str,
+) -> pd.DataFrame:
+    # Bars are bucketed by flooring their timestamp to the timeframe and each
+    # bucket is labelled with its start. Input is sorted, so every column is a
+    # single reduceat over the bucket starts
+    times = open.index.asi8
+    step = timeframe_delta(timeframe).value
+    buckets = times // step * step
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[:1] - 1))
+    ends = np.append(starts[1:], len(times))[: len(starts)] - 1
+    return pd.DataFrame(
+        {
+            "open": open.to_numpy()[starts],
+            "high": _reduce(np.maximum, high, starts),
+            "low": _reduce(np.minimum, low, starts),
+            "close": close.to_numpy()[ends],
+            "volume": _reduce(np.add, volume, starts),
+        },
+        index=pd.DatetimeIndex(buckets[starts], name=open.index.name),
+    )
+
+
+def _reduce(ufunc, values: pd.Series, starts: np.ndarray) -> np.ndarray:
+    if not len(starts):
+        return np.empty(0)
+    return ufunc.reduceat(values.to_numpy(float), starts)
+
+
+# Resampled bars go through the indicator cache, keyed by a digest of the base
+# bars like any other derived series, so they share its memory bound
+register_indicator(
+    "resample", resample_ohlcv, ["open", "high", "low", "close", "volume"]
+)
+
+
+def resample(data: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    return indicator_cache.get(data, "resample", timeframe=timeframe)
+
+
+def daily_closes(closes: pd.DataFrame) -> pd.DataFrame:
+    # Last row of each day, labelled with the day itself. Fills are booked on
+    # the last row at or before them, so any fill during a day lands on that
+    # day and is marked to its close
+    days = closes.index.normalize()
+    last = ~days.duplicated(keep="last")
+    return closes[last].set_axis(days[last])
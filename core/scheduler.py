@@ -0,0 +1,102 @@
+import time
+from datetime import datetime, timedelta, time as dtime
+
+from core.market import Market
+from models.market import MarketPhase
+
+
+class IntervalJob:
+    def __init__(self, interval: timedelta, callback, phase: MarketPhase):
+        self.interval = interval
+        self.callback = callback
+        self.phase = phase
+
+
+class MarketScheduler:
+    # Trading days to look ahead for the next event, in case no handlers are set
+    MAX_LOOKAHEAD_DAYS = 30
+
+    def __init__(self, market: Market, clock=None, sleep=time.sleep):
+        self._market = market
+        self._clock = clock or (lambda: datetime.now(market.bangkok_tz))
+        self._sleep = sleep
+        self._handlers = {}
+        self._jobs = []
+        self._stopped = False
+        self._calendar = market.calendar
+        self._transitions = market.calendar.transitions
+
+    def on_phase(self, phase: MarketPhase, handler):
+        self._handlers.setdefault(phase, []).append(handler)
+
+    def every(self, minutes: float, callback, phase=MarketPhase.MarketOpen):
+        self._jobs.append(IntervalJob(timedelta(minutes=minutes), callback, phase))
+
+    def stop(self):
+        self._stopped = True
+
+    def _localize(self, day, at: dtime) -> datetime:
+        return self._market.bangkok_tz.localize(datetime.combine(day, at))
+
+    def _day_events(self, day) -> list[tuple[datetime, list]]:
+        if not self._calendar.is_trading_day(day):
+            return []
+
+        events = {}
+        for index, (at, phase) in enumerate(self._transitions):
+            start = self._localize(day, at)
+            events.setdefault(start, []).extend(self._handlers.get(phase, []))
+
+            # Interval jobs fire inside their phase, until the next transition
+            jobs = [job for job in self._jobs if job.phase == phase]
+            if not jobs:
+                continue
+            if index + 1 < len(self._transitions):
+                end = self._localize(day, self._transitions[index + 1][0])
+            else:
+                end = self._localize(day + timedelta(days=1), dtime())
+            for job in jobs:
+                run_at = start + job.interval
+                while run_at < end:
+                    events.setdefault(run_at, []).append(job.callback)
+                    run_at += job.interval
+
+        return sorted((at, callbacks) for at, callbacks in events.items() if callbacks)
+
+    def next_event(self, after: datetime) -> tuple[datetime, list]:
+        day = after.date()
+        if not self._calendar.is_trading_day(day):
+            day = self._calendar.next_trading_day(day)
+        for _ in range(self.MAX_LOOKAHEAD_DAYS):
+            for at, callbacks in self._day_events(day):
+                if at > after:
+                    return at, callbacks
+            day = self._calendar.next_trading_day(day)
+        raise RuntimeError(
+            f"No market events within {self.MAX_LOOKAHEAD_DAYS} days after {after}"
+        )
+
+    def current_phase(self, now: datetime) -> MarketPhase:
+        if not self._calendar.is_trading_day(now.date()):
+            return MarketPhase.OutOfWorkingHours
+        return self._calendar.phase(now)
+
+    def run(self, catch_up: bool = True):
+        self._stopped = False
+        last_run = self._clock()
+
+        # Starting in the middle of a phase runs its handlers straight away
+        if catch_up:
+            for handler in self._handlers.get(self.current_phase(last_run), []):
+                handler(last_run)
+
+        while not self._stopped:
+            due_at, callbacks = self.next_event(last_run)
+            now = self._clock()
+            while now < due_at:
+                self._sleep((due_at - now).total_seconds())
+                now = self._clock()
+
+            last_run = due_at
+            for callback in callbacks:
+                callback(due_at)
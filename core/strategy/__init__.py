@@ -1,29 +1,70 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
 
+# Module import, core.indicator_cache itself imports core.strategy.indicators
+from core import indicator_cache
+
 
 class BaseStrategy(ABC):
     def __init__(self):
         self.MIN_PRICE_THRESHOLD = 10
         self.MAX_PRICE_THRESHOLD = 1000
+        self._indicator_states = {}
+        # Shared by every strategy in the process, see core/indicator_cache.py
+        self.indicator_cache = indicator_cache.indicator_cache
 
+    # Signals get the current bar's OHLCV and indicator values by column, as
+    # plain floats, not the frame of every bar so far
     @abstractmethod
     def signal_buy(
-        self, historical_data: pd.DataFrame, current_price: float
+        self, bar: dict[str, float], current_price: float
     ) -> tuple[float, str]:
         pass
 
     @abstractmethod
     def signal_sell(
-        self, historical_data: pd.DataFrame, current_price: float
+        self, bar: dict[str, float], current_price: float
     ) -> tuple[float, str]:
         pass
 
     @abstractmethod
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
+    def calculate_indicators(
+        self, data: pd.DataFrame, cache: bool = True
+    ) -> pd.DataFrame:
         pass
 
+    def create_indicator_state(self):
+        # Optional, strategies without one recalculate indicators in batch
+        return None
+
+    def supports_streaming(self) -> bool:
+        return (
+            type(self).create_indicator_state is not BaseStrategy.create_indicator_state
+        )
+
+    def seed_indicators(self, symbol: str, history: pd.DataFrame) -> dict:
+        self._indicator_states[symbol] = self.create_indicator_state()
+        values = {}
+        for timestamp, bar in zip(history.index, history.to_dict("records")):
+            values = self.update_indicators(symbol, timestamp, bar)
+        return values
+
+    def update_indicators(self, symbol: str, timestamp, bar) -> dict:
+        return self._indicator_states[symbol].update(timestamp, bar)
+
+    def indicator_state(self, symbol: str):
+        return self._indicator_states.get(symbol)
+
+    def score_cross_section(self, panel_slice) -> np.ndarray | None:
+        # Optional hook, one score per panel symbol at time t. Buys are made in
+        # descending score order and symbols scoring <= 0 or NaN are not bought
+        return None
+
+    def uses_cross_section(self) -> bool:
+        return type(self).score_cross_section is not BaseStrategy.score_cross_section
+
     def is_stock_price_appropriate(self, current_price: float) -> bool:
         return self.MIN_PRICE_THRESHOLD <= current_price <= self.MAX_PRICE_THRESHOLD
 
@@ -0,0 +1,164 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+import pandas as pd
+
+
+class RollingMean:
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+        self._evictions = 0
+
+    def update(self, value: float) -> float:
+        self._values.append(value)
+        self._sum += value
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+            self._evictions += 1
+            # Re-sum once per window so the running total doesn't drift
+            if self._evictions >= self.window:
+                self._sum = math.fsum(self._values)
+                self._evictions = 0
+
+        if len(self._values) < self.window:
+            return math.nan
+        return self._sum / self.window
+
+
+class EMA:
+    def __init__(self, span: float = None, alpha: float = None):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class RSI:
+    def __init__(self, period: int = 14, method: str = "rolling"):
+        if method not in ("rolling", "wilder"):
+            raise ValueError(f"Unknown RSI method '{method}'")
+        self.period = period
+        self.method = method
+        self._prev_close = None
+        self._count = 0
+        self._avg_gain = RollingMean(period)
+        self._avg_loss = RollingMean(period)
+        self._wilder_gain = 0.0
+        self._wilder_loss = 0.0
+
+    def update(self, close: float) -> float:
+        prev_close, self._prev_close = self._prev_close, close
+        if prev_close is None:
+            return math.nan
+
+        delta = close - prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        if self.method == "rolling":
+            avg_gain = self._avg_gain.update(gain)
+            avg_loss = self._avg_loss.update(loss)
+        else:
+            self._count += 1
+            if self._count <= self.period:
+                # Wilder seeds the averages with a simple mean of the first period
+                self._wilder_gain += gain / self.period
+                self._wilder_loss += loss / self.period
+            else:
+                self._wilder_gain += (gain - self._wilder_gain) / self.period
+                self._wilder_loss += (loss - self._wilder_loss) / self.period
+            if self._count < self.period:
+                return math.nan
+            avg_gain, avg_loss = self._wilder_gain, self._wilder_loss
+
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class MACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMA(span=fast)
+        self._slow = EMA(span=slow)
+        self._signal = EMA(span=signal)
+
+    def update(self, close: float) -> tuple[float, float]:
+        macd = self._fast.update(close) - self._slow.update(close)
+        return macd, self._signal.update(macd)
+
+
+class ATR:
+    def __init__(self, period: int = 14):
+        self._prev_close = None
+        self._mean = RollingMean(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(
+                true_range, abs(high - self._prev_close), abs(low - self._prev_close)
+            )
+        self._prev_close = close
+        return self._mean.update(true_range)
+
+
+class IndicatorState(ABC):
+    def __init__(self):
+        self.timestamp = None
+        self.values = {}
+
+    def update(self, timestamp, bar) -> dict:
+        values = dict(bar)
+        values.update(self._next(bar))
+        self.timestamp = timestamp
+        self.values = values
+        return values
+
+    @abstractmethod
+    def _next(self, bar) -> dict:
+        pass
+
+
+# Batch versions over a whole series, the streaming classes above reproduce
+# them bar by bar
+def sma(close: pd.Series, window: int) -> pd.Series:
+    return close.rolling(window=window).mean()
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    delta = close.diff()
+    gain, loss = delta.clip(lower=0), -delta.clip(upper=0)
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean()
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def macd(
+    close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
+) -> pd.DataFrame:
+    line = (
+        close.ewm(span=fast, adjust=False).mean()
+        - close.ewm(span=slow, adjust=False).mean()
+    )
+    return pd.DataFrame(
+        {"MACD": line, "Signal": line.ewm(span=signal, adjust=False).mean()}
+    )
+
+
+def atr(
+    high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
+) -> pd.Series:
+    tr = pd.concat(
+        [high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1
+    ).max(axis=1)
+    return tr.rolling(window=period).mean()
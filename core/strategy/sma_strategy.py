@@ -1,73 +1,132 @@
 import pandas as pd
 from core.strategy import BaseStrategy
+from core.strategy.indicators import (
+    ATR,
+    MACD,
+    RSI,
+    IndicatorState,
+    RollingMean,
+    atr,
+    macd,
+    rsi,
+)
+
+
+class SMAIndicatorState(IndicatorState):
+    def __init__(self, short_window: int, long_window: int, rsi_period: int):
+        super().__init__()
+        self._short_column = f"SMA_{short_window}"
+        self._long_column = f"SMA_{long_window}"
+        self._rsi = RSI(period=rsi_period)
+        self._macd = MACD(fast=12, slow=26, signal=9)
+        self._sma_short = RollingMean(short_window)
+        self._sma_long = RollingMean(long_window)
+        self._atr = ATR(period=14)
+
+    def _next(self, bar) -> dict:
+        close = bar["close"]
+        macd, signal = self._macd.update(close)
+        return {
+            "RSI": self._rsi.update(close),
+            "MACD": macd,
+            "Signal": signal,
+            self._short_column: self._sma_short.update(close),
+            self._long_column: self._sma_long.update(close),
+            "ATR": self._atr.update(bar["high"], bar["low"], close),
+        }
 
 
 class SMAStrategy(BaseStrategy):
-    def __init__(self):
+    def __init__(
+        self,
+        short_window: int = 50,
+        long_window: int = 200,
+        rsi_period: int = 14,
+        rsi_buy_threshold: float = 30,
+        rsi_sell_threshold: float = 70,
+    ):
         super().__init__()
         self.name = "SMA"
         self.description = "Simple Moving Average Strategy"
+        self.short_window = short_window
+        self.long_window = long_window
+        self.rsi_period = rsi_period
+        self.rsi_buy_threshold = rsi_buy_threshold
+        self.rsi_sell_threshold = rsi_sell_threshold
+        self._short_column = f"SMA_{short_window}"
+        self._long_column = f"SMA_{long_window}"
 
     def signal_buy(
-        self, historical_data: pd.DataFrame, current_price: float
+        self, bar: dict[str, float], current_price: float
     ) -> tuple[float, str]:
-        current_sma_50 = historical_data["SMA_50"].iloc[-1]
-        current_sma_200 = historical_data["SMA_200"].iloc[-1]
-        current_rsi = historical_data["RSI"].iloc[-1]
+        current_sma_short = bar[self._short_column]
+        current_sma_long = bar[self._long_column]
+        current_rsi = bar["RSI"]
 
-        if current_sma_50 > current_sma_200 and current_rsi > 30:
+        if (
+            current_sma_short > current_sma_long
+            and current_rsi > self.rsi_buy_threshold
+        ):
             return 1.0, "strong_buy"  # Strong buy signal
-        elif current_sma_50 > current_sma_200:
+        elif current_sma_short > current_sma_long:
             return 0.5, "moderate_buy"  # Moderate buy signal
         else:
             return 0.0, "no_buy"  # No buy signal
 
     def signal_sell(
-        self, historical_data: pd.DataFrame, current_price: float
+        self, bar: dict[str, float], current_price: float
     ) -> tuple[float, str]:
-        current_sma_50 = historical_data["SMA_50"].iloc[-1]
-        current_sma_200 = historical_data["SMA_200"].iloc[-1]
-        current_rsi = historical_data["RSI"].iloc[-1]
+        current_sma_short = bar[self._short_column]
+        current_sma_long = bar[self._long_column]
+        current_rsi = bar["RSI"]
 
-        if current_sma_50 < current_sma_200 and current_rsi < 70:
+        if (
+            current_sma_short < current_sma_long
+            and current_rsi < self.rsi_sell_threshold
+        ):
             return 1.0, "strong_sell"  # Strong sell signal
-        elif current_sma_50 < current_sma_200:
+        elif current_sma_short < current_sma_long:
             return 0.5, "moderate_sell"  # Moderate sell signal
         else:
             return 0.0, "no_sell"  # No sell signal
 
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        data["RSI"] = self.calculate_rsi(data["close"])
-        data["MACD"], data["Signal"] = self.calculate_macd(data["close"])
-        data["SMA_50"] = data["close"].rolling(window=50).mean()
-        data["SMA_200"] = data["close"].rolling(window=200).mean()
-        data["ATR"] = self.calculate_atr(data)
-        return data
+    def calculate_indicators(
+        self, data: pd.DataFrame, cache: bool = True
+    ) -> pd.DataFrame:
+        # Full frames come from the shared cache, so configs with the same
+        # windows on the same data compute them once. Per-bar prefixes skip it
+        indicator = self.indicator_cache.get if cache else self.indicator_cache.compute
+        macd = indicator(data, "macd")
+        return data.assign(
+            **{
+                "RSI": indicator(data, "rsi", period=self.rsi_period),
+                "MACD": macd["MACD"],
+                "Signal": macd["Signal"],
+                self._short_column: indicator(data, "sma", window=self.short_window),
+                self._long_column: indicator(data, "sma", window=self.long_window),
+                "ATR": indicator(data, "atr", period=14),
+            }
+        )
+
+    def create_indicator_state(self) -> SMAIndicatorState:
+        return SMAIndicatorState(
+            short_window=self.short_window,
+            long_window=self.long_window,
+            rsi_period=self.rsi_period,
+        )
 
     @staticmethod
     def calculate_rsi(data: pd.Series, period: int = 14) -> pd.Series:
-        delta = data.diff()
-        gain, loss = delta.clip(lower=0), -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return rsi(data, period=period)
 
     @staticmethod
     def calculate_macd(data: pd.Series):
-        ema_12 = data.ewm(span=12, adjust=False).mean()
-        ema_26 = data.ewm(span=26, adjust=False).mean()
-        macd = ema_12 - ema_26
-        signal = macd.ewm(span=9, adjust=False).mean()
-        return macd, signal
+        frame = macd(data)
+        return frame["MACD"], frame["Signal"]
 
     @staticmethod
     def calculate_atr(data: pd.DataFrame, period: int = 14) -> pd.Series:
-        high, low, close = data["high"], data["low"], data["close"]
-        tr = pd.concat(
-            [high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1
-        ).max(axis=1)
-        return tr.rolling(window=period).mean()
+        return atr(data["high"], data["low"], data["close"], period=period)
 
     def check_stop_loss(
         self,
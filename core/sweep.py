@@ -0,0 +1,74 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from core.metrics import metrics
+from core.strategy import BaseStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+# One bot per worker process, so OHLCV is loaded once and reused by every config
+_worker_bot = None
+_worker_strategy_class = None
+
+
+def _init_worker(strategy_class: BaseStrategy):
+    global _worker_bot, _worker_strategy_class
+    _worker_strategy_class = strategy_class
+    _worker_bot = TradingBot(
+        strategy_class=strategy_class, mode=TradingMode.Backtest, verbose=False
+    )
+    _worker_bot.load_backtest_data()
+
+
+def _run_config(args) -> dict:
+    params, start_date, end_date = args
+    # Timings and counters of this config only, not the worker's running total
+    metrics.reset()
+    _worker_bot.set_strategy(_worker_strategy_class(**params))
+    performance = _worker_bot.run_backtest(start_date, end_date) or {}
+    return {**params, **performance}
+
+
+def expand_grid(param_grid: dict) -> list[dict]:
+    keys = list(param_grid)
+    empty = [key for key in keys if not len(param_grid[key])]
+    if empty:
+        raise ValueError(f"param_grid has no values for {', '.join(empty)}")
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(param_grid[key] for key in keys))
+    ]
+
+
+def run_sweep(
+    strategy_class: BaseStrategy,
+    param_grid: dict,
+    start_date=None,
+    end_date=None,
+    max_workers: int = None,
+    rank_by: str = "roi",
+) -> pd.DataFrame:
+    configs = expand_grid(param_grid)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(configs))
+    print(f"Running {len(configs)} configurations on {max_workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(strategy_class,),
+    ) as pool:
+        results = list(
+            pool.map(
+                _run_config,
+                [(params, start_date, end_date) for params in configs],
+                chunksize=max(1, len(configs) // (max_workers * 4)),
+            )
+        )
+
+    table = pd.DataFrame(results)
+    if rank_by in table:
+        table = table.sort_values(rank_by, ascending=False, ignore_index=True)
+    return table
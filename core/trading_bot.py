@@ -1,45 +1,98 @@
 import time
-from datetime import datetime
-from core.discord import Discord
+from datetime import date, datetime
+from core.discord import DiscordNotifier
+from core.ledger import TradeLedger
+from core.live_state import LiveState
 from core.market import Market
-
+from core.market_data import MarketData, load_ohlcv
+from core.metrics import MetricsExporter, metrics
+from core.order_executor import AsyncOrderExecutor, UnresolvedOrder
+from core.panel import Panel, PanelSlice
+from core.performance import evaluate
+from core.resample import DAILY, daily_closes
+from core.scheduler import MarketScheduler
+
+import numpy as np
 import pandas as pd
 
 from core.strategy import BaseStrategy
 from database.crud import DB
+from database.ohlcv_cache import BarCache, OHLCVCache
 from models.market import MarketPhase, PlaceOrder
 from database.model import (
+    Bot,
     Signal,
     SideType,
     OrderStatus,
     Trade,
     Transaction,
-    Portfolio,
 )
 from config.settings import settings
 from models.trading_bot import TradingMode
 
 
 class TradingBot:
-    def __init__(self, strategy_class: BaseStrategy, mode: TradingMode):
-        self._db = DB()
-        self._discord = Discord()
+    def __init__(
+        self,
+        strategy_class: BaseStrategy,
+        mode: TradingMode,
+        strategy_params: dict = None,
+        verbose: bool = True,
+        db: DB = None,
+        bot_info: Bot = None,
+        strategy: BaseStrategy = None,
+        market_data: MarketData = None,
+        notifier: DiscordNotifier = None,
+        timeframe: str = DAILY,
+    ):
+        self._db = db or DB()
+        self._notifier = notifier or DiscordNotifier(settings.DISCORD_WEBHOOK_URL)
         self._market = Market()
+        self._ohlcv_cache = (
+            OHLCVCache(settings.OHLCV_CACHE_DIR) if settings.OHLCV_CACHE_DIR else None
+        )
+        self._bar_cache = None
+        self._timeframe = timeframe
         self._account = settings.ACCOUNT_NO
         self._broker = settings.ACCOUNT_BROKER
-        self._strategy = strategy_class()
+        self._strategy = strategy or strategy_class(**(strategy_params or {}))
+        self._market_data = market_data
         self._trading_mode = mode
+        self._verbose = verbose
         self._dataframes = {}
+        self._indicator_frames = {}
+        self._panel = None
         self._list_stocks = []
         self._trades = {}
+        self._historical_trades = {}
+        self._loaded_dataframes = {}
+        self._equity_curve = None
         self._initial_budget = 0
         self._available_budget = 0
         self._current_market_phase = None
+        self._market_open_at = None
+        self._pending_orders = []
+        self._unresolved_orders = []
+        self._metrics_exporter = MetricsExporter(
+            metrics,
+            port=settings.METRICS_PORT,
+            file_path=settings.METRICS_FILE,
+            interval=settings.METRICS_FILE_INTERVAL_SECONDS,
+        )
+        self._order_executor = AsyncOrderExecutor(
+            self._market,
+            max_concurrency=settings.ORDER_MAX_CONCURRENCY,
+            order_timeout=settings.ORDER_TIMEOUT,
+            alert=self._alert_log,
+        )
 
         # Initialize strategy, account, and bot
         self._strategy_info = self._init_strategy()
         self._account_info = self._init_account()
-        self._bot_info = self._load_bot_info()
+        self._bot_info = bot_info or self._load_bot_info()
+        self._live_state = LiveState(
+            self._account_info.account_no, self._bot_info.bot_id, alert=self._alert_log
+        )
 
     def _init_strategy(self):
         return self._db.get_strategy(strategy_name=self._strategy.name)
@@ -53,28 +106,129 @@ class TradingBot:
             strategy_id=self._strategy_info.strategy_id,
         )
 
-    def _prepare_ohlc_data(self):
+    def _prepare_ohlc_data(self, history_start: date = None):
         self._list_stocks = self._bot_info.trade_symbols
-        self._initial_budget = self._bot_info.initial_budget
-        self._available_budget = self._bot_info.available_budget
+        if self._trading_mode == TradingMode.Live:
+            self._live_state.hydrate(self._db, self._list_stocks)
+            self._initial_budget = self._live_state.initial_budget
+            self._sync_available_budget()
+        else:
+            self._initial_budget = self._bot_info.initial_budget
+            self._available_budget = self._bot_info.available_budget
 
-        self._trades = {stock: [] for stock in self._list_stocks}
-        self._dataframes = {
-            stock: self._load_ohlcv_data(stock) for stock in self._list_stocks
-        }
+        self._trades = {stock: TradeLedger() for stock in self._list_stocks}
+        if self._market_data is not None:
+            # Loaded once for every bot by the orchestrator
+            self._dataframes = self._market_data.frames(self._list_stocks)
+        else:
+            self._dataframes = self._load_ohlcv_data(
+                self._list_stocks, history_start=history_start
+            )
+        self._indicator_frames = {}
+        self._panel = None
         print("Prepare OHLC data completed")
 
-    def _load_ohlcv_data(self, stock: str) -> pd.DataFrame:
-        ohlcv_data = self._db.get_ohlcv_by_symbol(stock)
-        if not ohlcv_data:
-            print(f"Warning: No data found for stock {stock}.")
-            return pd.DataFrame()
+    def _precompute_indicators(self):
+        # Indicators are causal, so computing them once over the full frame and
+        # slicing per bar gives the same rows as recomputing on every prefix
+        self._indicator_frames = self._calculate_indicator_frames(self._dataframes)
+        if self._verbose:
+            print("Indicators precomputed")
+
+    def _calculate_indicator_frames(self, dataframes) -> dict[str, pd.DataFrame]:
+        with metrics.timer("indicators_precompute"):
+            if self._market_data is not None:
+                return self._market_data.indicator_frames(self._strategy, dataframes)
+            return {
+                stock: self._strategy.calculate_indicators(df.copy())
+                for stock, df in dataframes.items()
+                if not df.empty
+            }
+
+    def _verify_precomputed_indicators(self, step: int = 1):
+        mismatches = []
+        for stock, indicators in self._indicator_frames.items():
+            df = self._dataframes[stock]
+            for position in range(0, len(df), step):
+                expected = self._strategy.calculate_indicators(
+                    df.iloc[: position + 1].copy(), cache=False
+                )
+                if not expected.equals(indicators.iloc[: position + 1]):
+                    mismatches.append((stock, df.index[position]))
+                    break
 
-        df = pd.DataFrame([vars(record) for record in ohlcv_data])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        five_years_ago = pd.Timestamp.now() - pd.DateOffset(years=5)
-        return df[df.index >= five_years_ago]
+        if mismatches:
+            details = ", ".join(f"{stock} at {date}" for stock, date in mismatches)
+            raise ValueError(
+                f"Precomputed indicators differ from per-bar calculation: {details}"
+            )
+        print("Precomputed indicators match per-bar calculation")
+
+    def _seed_indicator_states(self):
+        # States are seeded from the full history once, later reloads only push
+        # the bars that arrived since. Bots sharing the strategy share its states
+        if not self._strategy.supports_streaming():
+            print(f"No streaming indicators for {self._strategy.name}, using batch")
+            return
+        for stock, df in self._dataframes.items():
+            if df.empty:
+                continue
+            if self._strategy.indicator_state(stock) is None:
+                self._strategy.seed_indicators(stock, df)
+            else:
+                self._advance_indicator_state(stock, df, df.index[-1])
+        print("Indicator states seeded")
+
+    def _advance_indicator_state(self, stock, df, until):
+        state = self._strategy.indicator_state(stock)
+        if until <= state.timestamp:
+            return
+        # Bars after the state's last one, O(1) per bar
+        with metrics.timer("indicators_stream"):
+            start, end = df.index.searchsorted([state.timestamp, until], side="right")
+            new_bars = df.iloc[start:end]
+            for timestamp, bar in zip(new_bars.index, new_bars.to_dict("records")):
+                self._strategy.update_indicators(stock, timestamp, bar)
+
+    def _indicator_bar(self, stock, df, current_date) -> dict[str, float]:
+        indicators = self._indicator_frames.get(stock)
+        if indicators is not None:
+            return indicators.loc[current_date].to_dict()
+        bar = self._stream_indicators(stock, df, current_date)
+        if bar is None:
+            with metrics.timer("indicators_calculate"):
+                bar = (
+                    self._strategy.calculate_indicators(
+                        df.loc[:current_date].copy(), cache=False
+                    )
+                    .iloc[-1]
+                    .to_dict()
+                )
+        return bar
+
+    def _stream_indicators(self, stock, df, current_date) -> dict[str, float] | None:
+        state = self._strategy.indicator_state(stock)
+        if state is None or current_date < state.timestamp:
+            return None
+        self._advance_indicator_state(stock, df, current_date)
+        return state.values
+
+    def _load_ohlcv_data(
+        self, stocks: list[str], timeframe: str = None, history_start: date = None
+    ) -> dict[str, pd.DataFrame]:
+        timeframe = timeframe or self._timeframe
+        if timeframe != DAILY and self._bar_cache is None and settings.BAR_CACHE_DIR:
+            self._bar_cache = BarCache(
+                settings.BAR_CACHE_DIR, settings.BAR_HISTORY_DAYS
+            )
+        return load_ohlcv(
+            self._db,
+            self._ohlcv_cache,
+            stocks,
+            timeframe,
+            self._bar_cache,
+            history_start=history_start,
+        )
 
     def _load_historical_data(self):
         # Load portfolio data
@@ -82,13 +236,11 @@ class TradingBot:
         for portfolio in portfolios:
             if portfolio.symbol in self._list_stocks:
                 self._trades[portfolio.symbol].append(
-                    {
-                        "type": "buy",
-                        "date": portfolio.created_at,
-                        "price": portfolio.entry_price,
-                        "volume": portfolio.holding_volume,
-                        "average_cost": portfolio.average_cost,
-                    }
+                    "buy",
+                    portfolio.created_at,
+                    portfolio.holding_volume,
+                    portfolio.entry_price,
+                    reason="portfolio",
                 )
 
         # Load historical trades
@@ -98,37 +250,41 @@ class TradingBot:
         for trade in historical_trades:
             if trade.symbol in self._list_stocks:
                 self._trades[trade.symbol].append(
-                    {
-                        "type": trade.type.value,
-                        "date": trade.trade_date,
-                        "price": trade.price,
-                        "volume": trade.volume,
-                    }
+                    trade.type.value,
+                    trade.trade_date,
+                    trade.volume,
+                    trade.price,
+                    commission=trade.commission + trade.vat + trade.wht,
+                    reason="history",
                 )
 
-        # Convert all dates to datetime.date objects
-        for stock in self._list_stocks:
-            for trade in self._trades[stock]:
-                if isinstance(trade["date"], datetime):
-                    trade["date"] = trade["date"].date()
-
-        # Sort trades by date for each stock
         for stock in self._list_stocks:
-            self._trades[stock].sort(key=lambda x: x["date"])
+            self._trades[stock].sort_by_date()
 
         print("Historical data loaded")
 
+    @metrics.timed("trading_logic")
     def _trading_logic(self, start_date, end_date):
         positions, entry_prices, volumes, last_trade_date = (
             self._initialize_trading_data()
         )
+        if self._trading_mode == TradingMode.Backtest:
+            self._backtest_bars(
+                start_date, end_date, positions, entry_prices, volumes, last_trade_date
+            )
+            return
+
+        self._reconcile_orders(positions, entry_prices, volumes)
         all_dates = pd.date_range(start=start_date, end=end_date)
 
         for current_date in all_dates:
             self._alert_log(f"Processing date: {current_date}")
-            if self._trading_mode == TradingMode.Live:
-                current_date = self._market.calculate_target_date(current_date)
-            for stock, df in self._dataframes.items():
+            current_date = self._market.calculate_target_date(current_date)
+            stocks, buyable = list(self._dataframes), None
+            if self._strategy.uses_cross_section():
+                stocks, buyable = self._rank_live_cross_section(current_date, stocks)
+            for stock in stocks:
+                df = self._dataframes[stock]
                 if current_date not in df.index:
                     continue
                 self._process_stock_on_date(
@@ -139,8 +295,107 @@ class TradingBot:
                     entry_prices,
                     volumes,
                     last_trade_date,
+                    allow_buy=buyable is None or stock in buyable,
+                )
+            if self._pending_orders:
+                self._submit_pending_orders(positions, entry_prices, volumes)
+
+    def _backtest_bars(
+        self, start_date, end_date, positions, entry_prices, volumes, last_trade_date
+    ):
+        stocks = [stock for stock, df in self._dataframes.items() if not df.empty]
+        if not stocks:
+            return
+        bar_times = [self._dataframes[stock].index.asi8.tolist() for stock in stocks]
+
+        # Walk the union of actual bar timestamps, each symbol keeps a cursor
+        # into its own bars instead of looking every date up in its index
+        timeline = np.unique(np.concatenate([np.asarray(t) for t in bar_times]))
+        timeline = timeline[
+            (timeline >= pd.Timestamp(start_date).value)
+            & (timeline <= pd.Timestamp(end_date).value)
+        ]
+        if not len(timeline):
+            return
+        cursors = [int(np.searchsorted(times, timeline[0])) for times in bar_times]
+
+        # Indicator rows as float arrays, each bar hands the strategy one row of
+        # scalars instead of a slice of the frame
+        columns, rows = [], []
+        for stock in stocks:
+            indicators = self._indicator_frames.get(stock)
+            columns.append(None if indicators is None else list(indicators.columns))
+            rows.append(None if indicators is None else indicators.to_numpy(float))
+
+        panel = None
+        if self._strategy.uses_cross_section():
+            panel = self._cross_section_panel(stocks)
+            panel_start = int(np.searchsorted(panel.timestamps.view("i8"), timeline[0]))
+
+        order, buyable = range(len(stocks)), None
+        for offset, bar_time in enumerate(timeline.tolist()):
+            current_date = pd.Timestamp(bar_time)
+            self._alert_log(f"Processing date: {current_date}")
+            if panel is not None:
+                order, buyable = self._rank_cross_section(
+                    panel.at(panel_start + offset)
+                )
+            for index in order:
+                stock = stocks[index]
+                cursor = cursors[index]
+                times = bar_times[index]
+                if cursor == len(times) or times[cursor] != bar_time:
+                    continue
+                cursors[index] = cursor + 1
+                self._process_stock_on_date(
+                    stock,
+                    self._dataframes[stock],
+                    current_date,
+                    positions,
+                    entry_prices,
+                    volumes,
+                    last_trade_date,
+                    bar=(
+                        None
+                        if rows[index] is None
+                        else dict(zip(columns[index], rows[index][cursor].tolist()))
+                    ),
+                    allow_buy=buyable is None or buyable[index],
                 )
 
+    def _rank_cross_section(self, panel_slice: PanelSlice):
+        scores = self._strategy.score_cross_section(panel_slice)
+        if scores is None:
+            return range(len(panel_slice.symbols)), None
+        scores = np.where(panel_slice.mask, np.asarray(scores, dtype=float), np.nan)
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+        return order.tolist(), scores > 0
+
+    def _cross_section_panel(self, stocks) -> Panel:
+        # Scorers read indicator columns, so the panel is built from indicator
+        # frames in both modes, computed here when they weren't precomputed
+        frames = self._indicator_frames
+        if not frames:
+            frames = self._calculate_indicator_frames(
+                {stock: self._dataframes[stock] for stock in stocks}
+            )
+        return Panel.from_frames(
+            {stock: frames.get(stock, self._dataframes[stock]) for stock in stocks}
+        )
+
+    def _rank_live_cross_section(self, current_date, stocks):
+        if self._panel is None:
+            # Built once per session, the bars are reloaded every Pre-Open
+            self._panel = self._cross_section_panel(stocks)
+        time_index = self._panel.time_index(current_date)
+        if time_index is None:
+            return stocks, None
+        order, buyable = self._rank_cross_section(self._panel.at(time_index))
+        if buyable is None:
+            return stocks, None
+        ranked = [self._panel.symbols[index] for index in order]
+        return ranked, {self._panel.symbols[index] for index in order if buyable[index]}
+
     def _initialize_trading_data(self):
         positions = {stock: 0 for stock in self._list_stocks}
         entry_prices = {stock: 0 for stock in self._list_stocks}
@@ -148,55 +403,56 @@ class TradingBot:
         last_trade_date = {stock: None for stock in self._list_stocks}
 
         if self._trading_mode == TradingMode.Live:
-            # Load portfolio data from the database
-            portfolios = self._db.get_portfolios_by_account(
-                self._account_info.account_no
-            )
-            for portfolio in portfolios:
-                if portfolio.symbol in self._list_stocks:
-                    positions[portfolio.symbol] = portfolio.holding_volume
-                    entry_prices[portfolio.symbol] = portfolio.average_cost
-                    volumes[portfolio.symbol] = portfolio.entry_volume
-
-            # Load last trade dates from the database
+            # Positions and last trade dates come from the in-memory live state
             for stock in self._list_stocks:
-                last_trade = self._db.get_last_trade_by_symbol(
-                    self._account_info.account_no, stock
-                )
-                if last_trade:
-                    last_trade_date[stock] = last_trade.trade_date
+                position = self._live_state.positions.get(stock)
+                if position:
+                    positions[stock] = position.holding_volume
+                    entry_prices[stock] = position.average_cost
+                    volumes[stock] = position.entry_volume
+                last_trade_date[stock] = self._live_state.last_trade_dates.get(stock)
 
         return positions, entry_prices, volumes, last_trade_date
 
     def _process_stock_on_date(
-        self, stock, df, current_date, positions, entry_prices, volumes, last_trade_date
+        self,
+        stock,
+        df,
+        current_date,
+        positions,
+        entry_prices,
+        volumes,
+        last_trade_date,
+        bar=None,
+        allow_buy=True,
     ):
-        historical_data = self._strategy.calculate_indicators(
-            df.loc[:current_date].copy()
-        )
-        current_price = historical_data["close"].iloc[-1]
+        if bar is None:
+            bar = self._indicator_bar(stock, df, current_date)
+        metrics.inc("bars_processed")
+        current_price = bar["close"]
 
         if not self._strategy.is_stock_price_appropriate(current_price):
             return
 
-        self._process_buy_signal(
-            stock,
-            historical_data,
-            current_price,
-            current_date,
-            positions,
-            entry_prices,
-            volumes,
-            last_trade_date,
-        )
+        if allow_buy:
+            self._process_buy_signal(
+                stock,
+                bar,
+                current_price,
+                current_date,
+                positions,
+                entry_prices,
+                volumes,
+                last_trade_date,
+            )
         self._process_sell_signal(
-            stock, historical_data, current_price, positions, volumes, current_date
+            stock, bar, current_price, positions, volumes, current_date
         )
 
     def _process_buy_signal(
         self,
         stock,
-        historical_data,
+        bar,
         current_price,
         current_date,
         positions,
@@ -204,9 +460,8 @@ class TradingBot:
         volumes,
         last_trade_date,
     ):
-        buy_signal, position_type = self._strategy.signal_buy(
-            historical_data, current_price
-        )
+        with metrics.timer("signal_buy"):
+            buy_signal, position_type = self._strategy.signal_buy(bar, current_price)
         if buy_signal > 0:
             if self._available_budget > 0:
                 shares_to_buy = self._calculate_shares_to_buy(
@@ -226,11 +481,10 @@ class TradingBot:
                     last_trade_date[stock] = current_date
 
     def _process_sell_signal(
-        self, stock, historical_data, current_price, positions, volumes, current_date
+        self, stock, bar, current_price, positions, volumes, current_date
     ):
-        sell_signal, position_type = self._strategy.signal_sell(
-            historical_data, current_price
-        )
+        with metrics.timer("signal_sell"):
+            sell_signal, position_type = self._strategy.signal_sell(bar, current_price)
         if sell_signal > 0:
             shares_to_sell = int(positions[stock] * sell_signal)
             if shares_to_sell > 0:
@@ -271,46 +525,11 @@ class TradingBot:
                 )
 
                 # Check for duplicate signal
-                if not self._db.check_duplicate_signal(new_signal):
-                    # Add the signal if it's not a duplicate
-                    self._db.add_signal(new_signal)
-
-                    # Place the order
-                    order_result = self._place_order(new_signal)
-
-                    if order_result:
-                        # Update signal status to Open
-                        self._db.update_signal_status(
-                            new_signal.signal_id, OrderStatus.Open
-                        )
-
-                        # Proceed with the buy execution using order_result values
-                        positions[stock] += order_result.volume
-                        entry_prices[stock] = order_result.price
-                        volumes[stock] += order_result.volume
-                        self._trades[stock].append(
-                            (
-                                "buy",
-                                order_result.trade_date,
-                                order_result.volume,
-                                order_result.price,
-                                position_type,
-                            )
-                        )
-
-                        # Fetch updated budget from database
-                        self._bot_info = self._load_bot_info()
-                        self._available_budget = self._bot_info.available_budget
-
-                        self._alert_log(
-                            f"[BUY]: {order_result.symbol} at {order_result.price} volume {order_result.volume} because {position_type}"
-                        )
-                    else:
-                        # Update signal status to Rejected
-                        self._db.update_signal_status(
-                            new_signal.signal_id, OrderStatus.Rejected
-                        )
-                        self._alert_log(f"Buy order for {stock} was rejected.")
+                if not self._is_duplicate_signal(new_signal):
+                    # Reserve the budget now, orders go out together once every
+                    # symbol has been decided
+                    self._available_budget -= cost
+                    self._pending_orders.append(new_signal)
 
                 else:
                     self._alert_log(
@@ -322,7 +541,12 @@ class TradingBot:
                 self._available_budget -= cost
                 volumes[stock] += shares_to_buy
                 self._trades[stock].append(
-                    ("buy", current_date, shares_to_buy, current_price, position_type)
+                    "buy",
+                    current_date,
+                    shares_to_buy,
+                    current_price,
+                    commission=cost - shares_to_buy * current_price,
+                    reason=position_type,
                 )
                 self._alert_log(
                     f"[BUY]: {stock} at {current_price} volume {shares_to_buy} because {position_type}"
@@ -353,45 +577,8 @@ class TradingBot:
                 )
 
                 # Check for duplicate signal
-                if not self._db.check_duplicate_signal(new_signal):
-                    # Add the signal if it's not a duplicate
-                    self._db.add_signal(new_signal)
-
-                    # Place the order
-                    order_result = self._place_order(new_signal)
-
-                    if order_result:
-                        # Update signal status to Open
-                        self._db.update_signal_status(
-                            new_signal.signal_id, OrderStatus.Open
-                        )
-
-                        # Proceed with the sell execution
-                        positions[stock] -= order_result.volume
-                        volumes[stock] += order_result.volume
-                        self._trades[stock].append(
-                            (
-                                "sell",
-                                order_result.trade_date,
-                                order_result.volume,
-                                order_result.price,
-                                position_type,
-                            )
-                        )
-
-                        # Fetch updated budget from database
-                        self._bot_info = self._load_bot_info()
-                        self._available_budget = self._bot_info.available_budget
-
-                        self._alert_log(
-                            f"[SELL]: {order_result.symbol} at {order_result.price} volume {order_result.volume} because {position_type}"
-                        )
-                    else:
-                        # Update signal status to Rejected
-                        self._db.update_signal_status(
-                            new_signal.signal_id, OrderStatus.Rejected
-                        )
-                        self._alert_log(f"Sell order for {stock} was rejected.")
+                if not self._is_duplicate_signal(new_signal):
+                    self._pending_orders.append(new_signal)
 
                 else:
                     self._alert_log(
@@ -399,153 +586,165 @@ class TradingBot:
                     )
             else:  # Backtest mode
                 revenue = shares_to_sell * current_price
+                commission = revenue * self._market.commission_rate
                 positions[stock] -= shares_to_sell
-                self._available_budget += revenue
+                # Net of fees, as in the equity curve
+                self._available_budget += revenue - commission
                 volumes[stock] += shares_to_sell
                 self._trades[stock].append(
-                    ("sell", current_date, shares_to_sell, current_price, position_type)
+                    "sell",
+                    current_date,
+                    shares_to_sell,
+                    current_price,
+                    commission=commission,
+                    reason=position_type,
                 )
                 self._alert_log(
                     f"[SELL]: {stock} at {current_price} volume {shares_to_sell} because {position_type}"
                 )
 
-    def _place_order(self, signal: Signal) -> Trade | None:
-        place_order = PlaceOrder(
-            account_no=signal.account_no,
-            symbol=signal.symbol,
-            side=signal.type,
-            price=signal.price,
-            volume=signal.volume,
-        )
-
-        MAX_RETRIES = 3
-        retry_count = 0
-
-        while retry_count < MAX_RETRIES:
-            trade_result = self._market.place_order(place_order)
-            if trade_result:
-                # Add the trade to the database
-                new_trade = Trade(
-                    account_no=trade_result.account_no,
-                    order_no=trade_result.order_no,
-                    symbol=trade_result.symbol,
-                    type=trade_result.type,
-                    price=trade_result.price,
-                    volume=trade_result.volume,
-                    commission=trade_result.commission,
-                    vat=trade_result.vat,
-                    wht=trade_result.wht,
-                    trade_date=trade_result.trade_date,
-                    trade_time=trade_result.trade_time,
-                    status=trade_result.status,
-                )
-                self._db.add_trade(new_trade)
-
-                # Create a transaction to link the signal and trade
-                new_transaction = Transaction(
-                    trade_id=new_trade.trade_id, signal_id=signal.signal_id
-                )
-                self._db.add_transaction(new_transaction)
-
-                # Update the signal status to Matched
-                self._db.update_signal_status(signal.signal_id, OrderStatus.Matched)
-
-                # Update Bot's budget
-                self._update_bot_budget(trade_result)
-
-                # Update Portfolio
-                self._update_portfolio(trade_result)
+    def _submit_pending_orders(self, positions, entry_prices, volumes):
+        signals, self._pending_orders = self._pending_orders, []
+        place_orders = [
+            PlaceOrder(
+                account_no=signal.account_no,
+                symbol=signal.symbol,
+                side=signal.type,
+                price=signal.price,
+                volume=signal.volume,
+            )
+            for signal in signals
+        ]
+        # Pending signals are committed before anything reaches the broker, so
+        # duplicate checks see them and an order interrupted by a crash leaves
+        # a trace
+        self._db.add_signals(signals)
+        with metrics.timer("orders_submit"):
+            order_results = self._order_executor.run(place_orders)
+        if self._market_open_at is not None:
+            self._alert_log(
+                f"{len(signals)} orders placed, last order sent "
+                f"{self._order_executor.last_sent_at - self._market_open_at:.3f}s after market open"
+            )
 
-                return trade_result
-            else:
-                retry_count += 1
-                if retry_count < MAX_RETRIES:
-                    self._alert_log(
-                        f"Retrying order placement for {signal.symbol} (Attempt {retry_count + 1}/{MAX_RETRIES})"
-                    )
-                    time.sleep(1)  # Add a small delay between retries
-                else:
-                    self._alert_log(
-                        f"Order placement failed after {MAX_RETRIES} attempts for {signal.symbol}"
-                    )
-                    return None
-
-    def _update_portfolio(self, trade: Trade):
-        portfolio = self._db.get_portfolio(trade.account_no, trade.symbol)
-        if portfolio:
-            if trade.type == SideType.buy:
-                # Calculate total trading costs
-                total_costs = trade.commission + trade.vat + trade.wht
-
-                # Buy: Update holding volume and average cost (including trading costs)
-                portfolio.holding_volume += trade.volume
-                total_cost_with_fees = (trade.price * trade.volume) + total_costs
-                portfolio.average_cost = (
-                    (portfolio.average_cost * (portfolio.holding_volume - trade.volume))
-                    + total_cost_with_fees
-                ) / portfolio.holding_volume
-                # Update profit based on unrealized gains/losses
-                portfolio.profit = (
-                    trade.price - portfolio.average_cost
-                ) * portfolio.holding_volume
-            else:  # sell
-                # Calculate total trading costs
-                total_costs = trade.commission + trade.vat + trade.wht
-
-                # Calculate realized profit for this sale (including trading costs)
-                realized_profit = (
-                    (trade.price * trade.volume)
-                    - (portfolio.average_cost * trade.volume)
-                    - total_costs
-                )
-                portfolio.profit += realized_profit
+        # Results are applied and recorded one at a time, in decision order
+        for signal, order_result in zip(signals, order_results):
+            if isinstance(order_result, UnresolvedOrder):
+                # Stays Pending with its budget reserved until the broker answers
+                self._unresolved_orders.append((signal, order_result))
+                continue
+            self._apply_order_result(
+                signal, order_result, positions, entry_prices, volumes
+            )
+            self._record_order(signal, order_result)
+
+        # Release reservations of rejected buys
+        self._sync_available_budget()
+
+    def _reconcile_orders(self, positions, entry_prices, volumes):
+        # Orders that timed out are booked once their broker call has returned,
+        # before any new decision is made on their symbols
+        unresolved, self._unresolved_orders = self._unresolved_orders, []
+        for signal, order in unresolved:
+            if not order.done():
+                self._unresolved_orders.append((signal, order))
+                continue
+            order_result = order.result()
+            self._alert_log(
+                f"Timed out {signal.type.value} order for {signal.symbol} was "
+                f"{'filled' if order_result else 'not filled'} by the broker"
+            )
+            self._apply_order_result(
+                signal, order_result, positions, entry_prices, volumes
+            )
+            self._record_order(signal, order_result)
+        self._sync_available_budget()
+
+    def _sync_available_budget(self):
+        # Filled orders are in the live state, unresolved buys stay reserved
+        self._available_budget = self._live_state.available_budget - sum(
+            signal.price * signal.volume * (1 + self._market.commission_rate)
+            for signal, _ in self._unresolved_orders
+            if signal.type == SideType.buy
+        )
 
-                # Update holding volume
-                portfolio.holding_volume -= trade.volume
-                if portfolio.holding_volume == 0:
-                    portfolio.average_cost = 0
-                # If still holding shares, update unrealized profit
-                else:
-                    portfolio.profit += (
-                        trade.price - portfolio.average_cost
-                    ) * portfolio.holding_volume
+    def _is_duplicate_signal(self, signal: Signal) -> bool:
+        # No new order on a symbol while one is still awaiting the broker
+        if any(
+            pending.symbol == signal.symbol for pending, _ in self._unresolved_orders
+        ):
+            return True
+        return self._db.check_duplicate_signal(signal)
 
-            self._db.update_portfolio(portfolio)
-        else:
-            # Calculate total trading costs for initial position
-            total_costs = trade.commission + trade.vat + trade.wht
-            initial_total_cost = (trade.price * trade.volume) + total_costs
-            initial_average_cost = initial_total_cost / trade.volume
-
-            new_portfolio = Portfolio(
-                account_no=trade.account_no,
-                symbol=trade.symbol,
-                entry_price=trade.price,
-                entry_volume=trade.volume,
-                average_cost=initial_average_cost,  # Include trading costs in average cost
-                holding_volume=trade.volume,
-                profit=0,  # Initial profit is 0
+    def _apply_order_result(
+        self,
+        signal: Signal,
+        order_result: Trade | None,
+        positions,
+        entry_prices,
+        volumes,
+    ):
+        stock, side = signal.symbol, signal.type
+        if not order_result:
+            self._alert_log(
+                f"{side.value.capitalize()} order for {stock} was rejected."
             )
-            self._db.add_portfolio(new_portfolio)
+            return
 
-    def _update_bot_budget(self, trade: Trade):
-        total_cost = (
-            trade.price * trade.volume + trade.commission + trade.vat + trade.wht
+        if side == SideType.buy:
+            positions[stock] += order_result.volume
+            entry_prices[stock] = order_result.price
+        else:
+            positions[stock] -= order_result.volume
+        volumes[stock] += order_result.volume
+        self._trades[stock].append(
+            side.value,
+            order_result.trade_date,
+            order_result.volume,
+            order_result.price,
+            # All broker fees, not just the commission
+            commission=order_result.commission + order_result.vat + order_result.wht,
+            reason=signal.position_type,
+        )
+        self._alert_log(
+            f"[{side.value.upper()}]: {order_result.symbol} at {order_result.price} volume {order_result.volume} because {signal.position_type}"
         )
 
-        if trade.type == SideType.buy:
-            self._bot_info.available_budget -= total_cost
-        else:  # sell
-            # Calculate profit/loss for this trade
-            portfolio = self._db.get_portfolio(trade.account_no, trade.symbol)
-            if portfolio:
-                trade_profit = (trade.price - portfolio.average_cost) * trade.volume - (
-                    trade.commission + trade.vat + trade.wht
-                )
-                self._bot_info.total_profit_loss += trade_profit
-            self._bot_info.available_budget += total_cost
+    def _record_order(self, signal: Signal, trade_result: Trade | None):
+        # Signal status, trade, transaction, budget and portfolio commit together
+        # or not at all
+        with self._db.unit_of_work() as uow:
+            if not trade_result:
+                signal.status = OrderStatus.Rejected
+                uow.update_signal_status(signal.signal_id, signal.status)
+                return
+
+            signal.status = OrderStatus.Open
+            uow.update_signal_status(signal.signal_id, signal.status)
+
+            new_trade = Trade(
+                account_no=trade_result.account_no,
+                order_no=trade_result.order_no,
+                symbol=trade_result.symbol,
+                type=trade_result.type,
+                price=trade_result.price,
+                volume=trade_result.volume,
+                commission=trade_result.commission,
+                vat=trade_result.vat,
+                wht=trade_result.wht,
+                trade_date=trade_result.trade_date,
+                trade_time=trade_result.trade_time,
+                status=trade_result.status,
+            )
+            uow.add_trade(new_trade)
+
+            # Create a transaction to link the signal and trade
+            uow.add_transaction(
+                Transaction(trade_id=new_trade.trade_id, signal_id=signal.signal_id)
+            )
 
-        self._db.update_bot(self._bot_info)
+            # Budget and portfolio are written through from the live state
+            self._live_state.apply_fill(uow, trade_result)
 
     def _calculate_shares_to_buy(
         self,
@@ -557,8 +756,7 @@ class TradingBot:
     ) -> int:
         # Check if we already have a position in this stock
         if self._trading_mode == TradingMode.Live:
-            portfolio = self._db.get_portfolio(self._account_info.account_no, stock)
-            if portfolio and portfolio.holding_volume > 0:
+            if self._live_state.holding_volume(stock) > 0:
                 return 0
         else:  # Backtest mode
             if positions and positions[stock] > 0:
@@ -575,17 +773,95 @@ class TradingBot:
 
     def _alert_log(self, message):
         if self._trading_mode == TradingMode.Live:
-            self._discord.send_message_to_discord(
-                url=settings.DISCORD_WEBHOOK_URL,
-                message=message,
-            )
+            self._notifier.send(message)
+
+        if self._verbose:
+            print(message)
 
-        print(message)
+    def backtest(
+        self,
+        start_date=None,
+        end_date=None,
+        precompute_indicators=True,
+        verify_indicators=False,
+        timeframe: str = None,
+    ):
+        metrics.reset()
+        self.load_backtest_data(timeframe)
+        return self.run_backtest(
+            start_date, end_date, precompute_indicators, verify_indicators
+        )
 
-    def backtest(self, start_date=None, end_date=None):
+    def load_backtest_data(
+        self,
+        timeframe: str = None,
+        live_history: bool = False,
+        history_start: date = None,
+    ):
+        # Bars of every later run come from this load, at this timeframe, and
+        # from history_start on if the runs reach back past OHLCV_HISTORY_YEARS.
+        # Runs start from empty ledgers, live_history seeds them with the
+        # account's real portfolio and trades instead
+        self._timeframe = timeframe or self._timeframe
         self._trading_mode = TradingMode.Backtest
-        self._prepare_ohlc_data()
-        self._load_historical_data()
+        self._prepare_ohlc_data(history_start)
+        if live_history:
+            self._load_historical_data()
+        # Keep a copy so repeated runs over the loaded data start from the same trades
+        self._historical_trades = {
+            stock: ledger.copy() for stock, ledger in self._trades.items()
+        }
+        self._loaded_dataframes = self._dataframes
+
+    def set_data_window(self, start_date=None, end_date=None):
+        # Slices of the loaded frames, so later runs only read bars in the window
+        self._dataframes = {
+            stock: df if df.empty else df.loc[start_date:end_date]
+            for stock, df in self._loaded_dataframes.items()
+        }
+        self._indicator_frames = {}
+        self._panel = None
+
+    @property
+    def trade_symbols(self) -> list[str]:
+        return self._bot_info.trade_symbols
+
+    @property
+    def initial_budget(self) -> float:
+        return self._initial_budget
+
+    @property
+    def ledgers(self) -> dict[str, TradeLedger]:
+        return self._trades
+
+    @property
+    def equity_curve(self) -> pd.DataFrame | None:
+        # Daily equity and gross position value of the last evaluated run
+        return self._equity_curve
+
+    def set_strategy(self, strategy: BaseStrategy):
+        self._strategy = strategy
+        self._indicator_frames = {}
+        self._panel = None
+
+    def run_backtest(
+        self,
+        start_date=None,
+        end_date=None,
+        precompute_indicators=True,
+        verify_indicators=False,
+    ):
+        self._trades = {
+            stock: ledger.copy() for stock, ledger in self._historical_trades.items()
+        }
+        self._indicator_frames = {}
+        # A run without bars returns before evaluation, it must not leave the
+        # previous run's curve behind
+        self._equity_curve = None
+        if precompute_indicators:
+            self._precompute_indicators()
+            if verify_indicators:
+                self._verify_precomputed_indicators()
         self._initial_budget = self._available_budget = 50000
         # Filter out empty dataframes
         non_empty_dfs = {k: df for k, df in self._dataframes.items() if not df.empty}
@@ -600,97 +876,95 @@ class TradingBot:
             end_date = max(df.index.max() for df in non_empty_dfs.values())
 
         self._trading_logic(start_date, end_date)
-        performance = self.evaluate_performance()
-
-        print(f"Backtesting completed for period: {start_date} to {end_date}")
-        print("Backtesting Performance:")
-        print(f"Initial Budget: ${self._initial_budget:.2f}")
-        print(f"Total Profit/Loss: ${performance['total_profit_loss']:.2f}")
-        print(f"Total Trades: {performance['total_trades']}")
-        print(f"Win Rate: {performance['win_rate']:.2f}%")
-        print(f"ROI: {performance['roi']:.2f}%")
-
-    def live_trading(self):
+        performance = self.evaluate_performance(start_date, end_date)
+
+        if self._verbose:
+            print(f"Backtesting completed for period: {start_date} to {end_date}")
+            print("Backtesting Performance:")
+            print(f"Initial Budget: ${self._initial_budget:.2f}")
+            print(f"Total Profit/Loss: ${performance['total_profit_loss']:.2f}")
+            print(f"Total Trades: {performance['total_trades']}")
+            print(f"Win Rate: {performance['win_rate']:.2f}%")
+            print(f"ROI: {performance['roi']:.2f}%")
+            print(f"Sharpe Ratio: {performance['sharpe_ratio']:.2f}")
+            print(f"Sortino Ratio: {performance['sortino_ratio']:.2f}")
+            print(f"Max Drawdown: {performance['max_drawdown']:.2f}%")
+            print(f"Exposure: {performance['exposure']:.2f}%")
+            print(f"Turnover: {performance['turnover']:.2f}x")
+            if metrics.enabled:
+                print("Timings:")
+                print(metrics.report())
+        return performance
+
+    def live_trading(self, scheduler: MarketScheduler = None):
+        self._notifier.start()
+        self._metrics_exporter.start()
+        # Sleeps until the next phase transition instead of polling the clock
+        scheduler = scheduler or MarketScheduler(self._market)
+        self.prepare_live_session(scheduler)
+        try:
+            scheduler.run()
+        finally:
+            # Flush queued alerts and metrics before the process exits
+            self._notifier.close()
+            self._metrics_exporter.close()
+            self.close()
+
+    def close(self):
+        # Releases the broker threads, a call that timed out isn't waited on
+        self._order_executor.close()
+
+    def prepare_live_session(self, scheduler: MarketScheduler):
         self._trading_mode = TradingMode.Live
         self._prepare_ohlc_data()
+        self._seed_indicator_states()
         self._load_historical_data()
-        while True:
-            current_datetime = datetime.now(self._market.bangkok_tz)
-            is_market_open, market_phase = self._market.is_market_open(current_datetime)
-            if is_market_open and self._current_market_phase != market_phase:
-                self._current_market_phase = market_phase
-                if market_phase == MarketPhase.PreOpen:
-                    self._prepare_ohlc_data()
-                    self._load_historical_data()
-                    self._alert_log(f"Initial data loaded at {current_datetime}")
-                elif market_phase == MarketPhase.MarketOpen:
-                    self._alert_log(f"Market is open at {current_datetime}")
-                    current_date = current_datetime.date()
-                    self._trading_logic(current_date, current_date)
-                elif market_phase == MarketPhase.MarketClose:
-                    self._alert_log(f"Market is closed at {current_datetime}")
-
-            time.sleep(60)
-
-    def evaluate_performance(self):
-        total_profit_loss = 0
-        total_trades = 0
-        winning_trades = 0
-
-        for trades in self._trades.values():
-            # Convert all trades to a consistent format
-            normalized_trades = []
-            for trade in trades:
-                if isinstance(trade, dict):
-                    # Convert dictionary format to tuple format
-                    normalized_trades.append(
-                        (
-                            trade["type"],
-                            trade["date"],
-                            trade["volume"],
-                            trade["price"],
-                            "unknown",
-                        )
-                    )
-                else:
-                    # Already in tuple format
-                    normalized_trades.append(trade)
-
-            # Process trades in pairs
-            i = 0
-            while i < len(normalized_trades):
-                current_trade = normalized_trades[i]
-
-                # Find the next sell trade
-                next_sell_index = None
-                for j in range(i + 1, len(normalized_trades)):
-                    if normalized_trades[j][0] == "sell":
-                        next_sell_index = j
-                        break
-
-                if next_sell_index is not None:
-                    buy_trade = current_trade
-                    sell_trade = normalized_trades[next_sell_index]
-
-                    # Calculate profit/loss: (sell_price - buy_price) * volume
-                    profit_loss = (sell_trade[3] - buy_trade[3]) * buy_trade[2]
-                    total_profit_loss += profit_loss
-                    total_trades += 1
-                    if profit_loss > 0:
-                        winning_trades += 1
-
-                    # Move to the trade after the sell
-                    i = next_sell_index + 1
-                else:
-                    # No matching sell trade found
-                    break
 
-        win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-        roi = (total_profit_loss / self._initial_budget) * 100
+        scheduler.on_phase(MarketPhase.PreOpen, self._on_pre_open)
+        scheduler.on_phase(MarketPhase.MarketOpen, self._on_market_open)
+        scheduler.on_phase(MarketPhase.MarketClose, self._on_market_close)
+        if settings.REEVALUATION_INTERVAL_MINUTES:
+            scheduler.every(
+                settings.REEVALUATION_INTERVAL_MINUTES,
+                self._on_reevaluation,
+                phase=MarketPhase.MarketOpen,
+            )
 
-        return {
-            "total_profit_loss": total_profit_loss,
-            "total_trades": total_trades,
-            "win_rate": win_rate,
-            "roi": roi,
-        }
+    def _on_pre_open(self, current_datetime: datetime):
+        self._current_market_phase = MarketPhase.PreOpen
+        self._prepare_ohlc_data()
+        self._seed_indicator_states()
+        self._load_historical_data()
+        self._alert_log(f"Initial data loaded at {current_datetime}")
+
+    def _on_market_open(self, current_datetime: datetime):
+        self._current_market_phase = MarketPhase.MarketOpen
+        self._market_open_at = time.monotonic()
+        self._alert_log(f"Market is open at {current_datetime}")
+        current_date = current_datetime.date()
+        self._trading_logic(current_date, current_date)
+
+    def _on_reevaluation(self, current_datetime: datetime):
+        self._alert_log(f"Re-evaluating signals at {current_datetime}")
+        current_date = current_datetime.date()
+        self._trading_logic(current_date, current_date)
+
+    def _on_market_close(self, current_datetime: datetime):
+        self._current_market_phase = MarketPhase.MarketClose
+        self._alert_log(f"Market is closed at {current_datetime}")
+
+    @metrics.timed("evaluate_performance")
+    def evaluate_performance(self, start_date=None, end_date=None):
+        closes = pd.DataFrame(
+            {
+                stock: df["close"]
+                for stock, df in self._dataframes.items()
+                if not df.empty
+            }
+        )
+        # Intraday runs are marked to each day's last bar, metrics stay daily
+        closes = daily_closes(closes.loc[start_date:end_date].ffill())
+        performance, self._equity_curve = evaluate(
+            self._trades, closes, self._initial_budget
+        )
+        return performance
@@ -0,0 +1,189 @@
+import math
+import os
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from core.market_calendar import MarketCalendar
+from core.metrics import metrics
+from core.performance import risk_metrics
+from core.strategy import BaseStrategy
+from core.sweep import expand_grid
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+# One bot per worker process, so OHLCV is loaded once and sliced per fold
+_worker_bot = None
+_worker_strategy_class = None
+
+
+def _init_worker(strategy_class: BaseStrategy, history_start: date):
+    global _worker_bot, _worker_strategy_class
+    _worker_strategy_class = strategy_class
+    _worker_bot = TradingBot(
+        strategy_class=strategy_class, mode=TradingMode.Backtest, verbose=False
+    )
+    # From the first fold's warm-up on, which may be older than the history
+    # kept for live trading
+    _worker_bot.load_backtest_data(history_start=history_start)
+
+
+def make_folds(
+    start_date,
+    end_date,
+    train_days: int,
+    test_days: int,
+    step_days: int = None,
+    warmup_days: int = 0,
+) -> list[dict]:
+    # Rolling windows in trading days, each test window directly follows its
+    # train window. Warm-up bars before a window only feed the indicators and
+    # may reach back before start_date. Test windows can't overlap, their
+    # dates would repeat in the stitched curve
+    if step_days is not None and step_days < test_days:
+        raise ValueError(
+            f"step_days ({step_days}) must be at least test_days ({test_days})"
+        )
+    start_date = pd.Timestamp(start_date).date()
+    days = pd.DatetimeIndex(
+        MarketCalendar.from_settings().trading_days_between(
+            start_date - timedelta(days=warmup_days * 2 + 7),
+            pd.Timestamp(end_date).date(),
+        )
+    )
+    first = days.searchsorted(pd.Timestamp(start_date))
+    folds = []
+    for train_start in range(first, len(days) - train_days, step_days or test_days):
+        test_start = train_start + train_days
+        test_end = min(test_start + test_days, len(days)) - 1
+        folds.append(
+            {
+                "fold": len(folds),
+                "train_data_start": days[max(0, train_start - warmup_days)],
+                "train_start": days[train_start],
+                "train_end": days[test_start - 1],
+                "test_data_start": days[max(0, test_start - warmup_days)],
+                "test_start": days[test_start],
+                "test_end": days[test_end],
+            }
+        )
+    return folds
+
+
+def _score(performance: dict, rank_by: str) -> float:
+    score = performance.get(rank_by)
+    return -math.inf if score is None or math.isnan(score) else score
+
+
+def _run_fold(args) -> tuple[dict, pd.DataFrame | None, float, float]:
+    fold, param_grid, rank_by = args
+
+    # Train only ever sees bars up to the end of its own window
+    _worker_bot.set_data_window(fold["train_data_start"], fold["train_end"])
+    best_score, best_params = -math.inf, None
+    for params in expand_grid(param_grid):
+        # Timings and counters of each run only, not the worker's running total
+        metrics.reset()
+        _worker_bot.set_strategy(_worker_strategy_class(**params))
+        performance = _worker_bot.run_backtest(fold["train_start"], fold["train_end"])
+        score = _score(performance or {}, rank_by)
+        if best_params is None or score > best_score:
+            best_score, best_params = score, params
+
+    _worker_bot.set_data_window(fold["test_data_start"], fold["test_end"])
+    metrics.reset()
+    _worker_bot.set_strategy(_worker_strategy_class(**best_params))
+    performance = _worker_bot.run_backtest(fold["test_start"], fold["test_end"]) or {}
+    row = {
+        **fold,
+        **best_params,
+        f"train_{rank_by}": best_score,
+        **{f"test_{key}": value for key, value in performance.items()},
+    }
+    # Folds without bars in their test window have no curve to stitch
+    curve = _worker_bot.equity_curve if performance else None
+    # Turnover is notional over mean equity
+    traded_notional = (
+        performance["turnover"] * curve["equity"].mean() if performance else 0.0
+    )
+    return row, curve, _worker_bot.initial_budget, traded_notional
+
+
+def stitch_equity(
+    curves: list[tuple[pd.DataFrame, float]],
+) -> tuple[pd.DataFrame, list[float]]:
+    # Every fold starts from the same budget, so each is rescaled to start from
+    # where the previous one ended, which chains their daily returns
+    parts = []
+    scales = []
+    equity = None
+    for curve, initial_budget in curves:
+        if curve is None or curve.empty:
+            scales.append(0.0)
+            continue
+        if equity is None:
+            equity = initial_budget
+        scales.append(equity / initial_budget)
+        parts.append(curve * scales[-1])
+        equity = parts[-1]["equity"].iloc[-1]
+    if not parts:
+        return pd.DataFrame(columns=["equity", "gross"], dtype=float), scales
+    return pd.concat(parts), scales
+
+
+def run_walk_forward(
+    strategy_class: BaseStrategy,
+    param_grid: dict,
+    start_date,
+    end_date,
+    train_days: int = 504,
+    test_days: int = 126,
+    step_days: int = None,
+    warmup_days: int = 250,
+    max_workers: int = None,
+    rank_by: str = "sharpe_ratio",
+) -> dict:
+    folds = make_folds(
+        start_date, end_date, train_days, test_days, step_days, warmup_days
+    )
+    if not folds:
+        raise ValueError(
+            f"{start_date} to {end_date} is too short for {train_days} train days"
+        )
+    max_workers = min(max_workers or os.cpu_count() or 1, len(folds))
+    print(
+        f"Running {len(folds)} folds x {len(expand_grid(param_grid))} configurations "
+        f"on {max_workers} workers"
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(strategy_class, folds[0]["train_data_start"].date()),
+    ) as pool:
+        results = list(
+            pool.map(_run_fold, [(fold, param_grid, rank_by) for fold in folds])
+        )
+
+    table = pd.DataFrame([row for row, _, _, _ in results])
+    equity_curve, scales = stitch_equity(
+        [(curve, initial_budget) for _, curve, initial_budget, _ in results]
+    )
+
+    performance = {"total_return": 0.0, "total_trades": 0}
+    if not equity_curve.empty:
+        initial_budget = results[0][2]
+        traded_notional = sum(
+            notional * scale for (_, _, _, notional), scale in zip(results, scales)
+        )
+        performance = {
+            "total_return": float(
+                (equity_curve["equity"].iloc[-1] / initial_budget - 1) * 100
+            ),
+            "total_trades": int(table["test_total_trades"].fillna(0).sum()),
+            **risk_metrics(
+                equity_curve["equity"], equity_curve["gross"], traded_notional
+            ),
+        }
+    return {"folds": table, "equity_curve": equity_curve, "performance": performance}
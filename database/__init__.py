@@ -1,12 +1,48 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from config.settings import settings
+from core.metrics import metrics
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class InstrumentedQueuePool(QueuePool):
+    # Times how long a checkout waits for a free (or new) connection
+    def _do_get(self):
+        with metrics.timer("db_pool_checkout"):
+            return super()._do_get()
+
+
+# Connections are pinged on checkout and replaced after the recycle age, so a
+# Postgres restart or an idle timeout costs a reconnect instead of a failed query
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+)
+# Sessions are opened per call or unit of work and never shared between
+# threads. Loaded objects stay readable after the session closes
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+)
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    metrics.inc("db_connections_invalidated")
+
+
+metrics.gauge("db_pool_size", engine.pool.size)
+metrics.gauge("db_pool_checked_out", engine.pool.checkedout)
+metrics.gauge("db_pool_checked_in", engine.pool.checkedin)
+# overflow() counts up from -pool_size
+metrics.gauge("db_pool_overflow", lambda: max(engine.pool.overflow(), 0))
 
 Base = declarative_base()
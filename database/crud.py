@@ -1,8 +1,16 @@
-from sqlalchemy import select, and_, update
-from sqlalchemy.exc import IntegrityError
+import functools
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import select, and_, update, func
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import joinedload, sessionmaker
+from config.settings import settings
+from core.metrics import metrics
 from database import SessionLocal
 from database.model import (
     OHLCV,
+    OHLCVBar,
     Signal,
     OrderStatus,
     Strategy,
@@ -12,58 +20,336 @@ from database.model import (
     Transaction,
     Portfolio,
 )
+from database.partitions import ensure_range_partitions
+
+
+# Queries on the hot paths, shared with the query plan check in
+# database/migrations/plan_check.py
+def portfolio_query(account_no: str, symbol: str):
+    return (
+        select(Portfolio)
+        .where(Portfolio.account_no == account_no, Portfolio.symbol == symbol)
+        .limit(1)
+    )
+
+
+def duplicate_signal_query(signal: Signal):
+    return (
+        select(Signal)
+        .where(
+            and_(
+                Signal.bot_id == signal.bot_id,
+                Signal.symbol == signal.symbol,
+                Signal.type == signal.type,
+                Signal.position_type == signal.position_type,
+                Signal.status == OrderStatus.Pending,
+            )
+        )
+        .limit(1)
+    )
+
+
+def pending_signals_query(bot_id: int):
+    return select(Signal).where(
+        Signal.bot_id == bot_id, Signal.status != OrderStatus.Open
+    )
+
+
+def last_trade_query(account_no: str, symbol: str):
+    return (
+        select(Trade)
+        .where(Trade.account_no == account_no, Trade.symbol == symbol)
+        .order_by(Trade.trade_date.desc())
+        .limit(1)
+    )
+
+
+def ohlcv_bulk_query(symbols: list[str], start_date=None, end_date=None):
+    query = select(
+        OHLCV.symbol,
+        OHLCV.date,
+        OHLCV.open,
+        OHLCV.high,
+        OHLCV.low,
+        OHLCV.close,
+        OHLCV.volume,
+    ).where(OHLCV.symbol.in_(symbols))
+    if start_date is not None:
+        query = query.where(OHLCV.date >= start_date)
+    if end_date is not None:
+        query = query.where(OHLCV.date <= end_date)
+    return query.order_by(OHLCV.symbol, OHLCV.date)
+
+
+class UnitOfWork:
+    # Stages changes on its session, flushing only to get generated IDs
+    def __init__(self, session):
+        self.session = session
+        self._on_commit = []
+
+    def on_commit(self, callback):
+        self._on_commit.append(callback)
+
+    def _stage(self, instance):
+        self.session.add(instance)
+        self.session.flush()
+        return instance
+
+    def add_signal(self, signal: Signal):
+        return self._stage(signal)
+
+    def update_signal_status(self, signal_id: int, new_status: OrderStatus):
+        self.session.execute(
+            update(Signal)
+            .where(Signal.signal_id == signal_id)
+            .values(status=new_status)
+        )
+
+    def add_trade(self, trade: Trade):
+        return self._stage(trade)
+
+    def add_transaction(self, transaction: Transaction):
+        return self._stage(transaction)
+
+    def add_portfolio(self, portfolio: Portfolio):
+        return self._stage(portfolio)
+
+    def get_portfolio(self, account_no: str, symbol: str):
+        query = portfolio_query(account_no, symbol).execution_options(
+            populate_existing=True
+        )
+        return self.session.execute(query).scalars().first()
+
+    def update_portfolio(self, portfolio: Portfolio):
+        return self.session.merge(portfolio)
+
+    def update_bot(self, bot: Bot):
+        return self.session.merge(bot)
+
+    def get_bot_balance(self, bot_id: int):
+        return _get_bot_balance(self.session, bot_id)
+
+    def update_bot_balance(
+        self, bot_id: int, expected: tuple | None, balance: tuple
+    ) -> bool:
+        # Compare-and-set, no row is updated if the balance is not what we expect
+        query = update(Bot).where(Bot.bot_id == bot_id)
+        if expected is not None:
+            query = query.where(
+                Bot.available_budget == expected[0],
+                Bot.total_profit_loss == expected[1],
+            )
+        query = query.values(
+            available_budget=balance[0], total_profit_loss=balance[1]
+        ).execution_options(synchronize_session=False)
+        return self.session.execute(query).rowcount == 1
+
+    def update_portfolio_position(
+        self, portfolio_id: int, expected: tuple | None, position: tuple
+    ) -> bool:
+        query = update(Portfolio).where(Portfolio.portfolio_id == portfolio_id)
+        if expected is not None:
+            query = query.where(
+                Portfolio.holding_volume == expected[0],
+                Portfolio.average_cost == expected[1],
+            )
+        query = query.values(
+            holding_volume=position[0], average_cost=position[1], profit=position[2]
+        ).execution_options(synchronize_session=False)
+        return self.session.execute(query).rowcount == 1
+
+
+def _get_bot_balance(session, bot_id: int):
+    query = select(
+        Bot.initial_budget, Bot.available_budget, Bot.total_profit_loss
+    ).where(Bot.bot_id == bot_id)
+    balance = session.execute(query).first()
+    if balance is None:
+        raise ValueError(f"Bot {bot_id} not found")
+    return balance
+
+
+def _retry_read(func):
+    # Reads are idempotent, so a dropped connection is retried on a fresh
+    # session with backoff. Writes are never retried here
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(settings.DB_READ_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except DBAPIError as error:
+                retryable = error.connection_invalidated or isinstance(
+                    error, OperationalError
+                )
+                if not retryable or attempt == settings.DB_READ_RETRIES:
+                    raise
+                metrics.inc("db_read_retries")
+                print(f"Retrying {func.__name__} after database error: {error.orig}")
+                time.sleep(settings.DB_RETRY_BACKOFF_SECONDS * 2**attempt)
+
+    return wrapper
 
 
 class DB:
-    def __init__(self):
-        self.session = SessionLocal()
+    # Every call runs on its own short-lived session, so a DB can be shared by
+    # threads and tasks and no identity map outlives a call
+    def __init__(self, session_factory: sessionmaker = None):
+        self._sessions = session_factory or SessionLocal
 
-    def __del__(self):
-        self.session.close()
+    @contextmanager
+    def unit_of_work(self):
+        with self._sessions() as session:
+            try:
+                uow = UnitOfWork(session)
+                yield uow
+                with metrics.timer("db_commit"):
+                    session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        for callback in uow._on_commit:
+            callback()
 
     # OHLCV table
-    def get_ohlcv_by_symbol(self, symbol: str):
+    @_retry_read
+    def get_ohlcv_by_symbol(self, symbol: str, start_date=None):
         query = select(OHLCV).where(OHLCV.symbol == symbol)
-        result = self.session.execute(query).scalars().all()
-        return result
+        if start_date is not None:
+            query = query.where(OHLCV.date >= start_date)
+        with self._sessions() as session:
+            return session.execute(query).scalars().all()
+
+    @_retry_read
+    def get_ohlcv_bulk(self, symbols: list[str], start_date=None, end_date=None):
+        # Plain tuples from a Core select, no ORM objects are built per row
+        query = ohlcv_bulk_query(symbols, start_date, end_date)
+        with self._sessions() as session:
+            return session.connection().execute(query).all()
+
+    def create_ohlcv_partitions(self, start_date, end_date) -> list[str]:
+        # One partition per year
+        with self._sessions.begin() as session:
+            return ensure_range_partitions(
+                session.connection(), "ohlcv", "date", start_date, end_date, "year"
+            )
+
+    @_retry_read
+    def get_ohlcv_max_dates(self, symbols: list[str]) -> dict:
+        query = (
+            select(OHLCV.symbol, func.max(OHLCV.date))
+            .where(OHLCV.symbol.in_(symbols))
+            .group_by(OHLCV.symbol)
+        )
+        with self._sessions() as session:
+            return dict(session.execute(query).all())
+
+    # OHLCVBar table
+    def iter_ohlcv_bars(
+        self, symbols: list[str], start=None, end=None, batch_size: int = 100_000
+    ):
+        # Server-side cursor, rows arrive in batches instead of all at once
+        query = select(
+            OHLCVBar.symbol,
+            OHLCVBar.timestamp,
+            OHLCVBar.open,
+            OHLCVBar.high,
+            OHLCVBar.low,
+            OHLCVBar.close,
+            OHLCVBar.volume,
+        ).where(OHLCVBar.symbol.in_(symbols))
+        if start is not None:
+            query = query.where(OHLCVBar.timestamp >= start)
+        if end is not None:
+            query = query.where(OHLCVBar.timestamp <= end)
+        query = query.order_by(OHLCVBar.symbol, OHLCVBar.timestamp)
+        with self._sessions() as session:
+            result = (
+                session.connection()
+                .execution_options(stream_results=True, yield_per=batch_size)
+                .execute(query)
+            )
+            for rows in result.partitions():
+                yield rows
+
+    @_retry_read
+    def get_ohlcv_bar_max_timestamps(self, symbols: list[str]) -> dict:
+        query = (
+            select(OHLCVBar.symbol, func.max(OHLCVBar.timestamp))
+            .where(OHLCVBar.symbol.in_(symbols))
+            .group_by(OHLCVBar.symbol)
+        )
+        with self._sessions() as session:
+            return dict(session.execute(query).all())
+
+    def create_ohlcv_bar_partitions(self, start_date, end_date) -> list[str]:
+        # One partition per month, a range query only scans the months it covers
+        with self._sessions.begin() as session:
+            return ensure_range_partitions(
+                session.connection(),
+                "ohlcv_bar",
+                "timestamp",
+                start_date,
+                end_date,
+                "month",
+            )
 
     # Strategy table
+    @_retry_read
     def get_strategy(self, strategy_name: str):
-        strategy = (
-            self.session.query(Strategy).filter_by(strategy_name=strategy_name).first()
-        )
+        with self._sessions() as session:
+            strategy = (
+                session.query(Strategy).filter_by(strategy_name=strategy_name).first()
+            )
         if not strategy:
             raise ValueError(f"Strategy '{strategy_name}' not found.")
         return strategy
 
     # Account table
+    @_retry_read
     def get_account(self, account_no: str):
-        account = self.session.query(Account).filter_by(account_no=account_no).first()
+        with self._sessions() as session:
+            account = session.query(Account).filter_by(account_no=account_no).first()
         if not account:
             raise ValueError(f"Account '{account_no}' not found.")
         return account
 
     # Bot table
+    @_retry_read
     def get_bot(self, bot_name: str):
-        bot = self.session.query(Bot).filter_by(bot_name=bot_name).first()
+        with self._sessions() as session:
+            bot = session.query(Bot).filter_by(bot_name=bot_name).first()
         if not bot:
             raise ValueError(f"Bot '{bot_name}' not found.")
         return bot
 
     def update_bot(self, bot: Bot):
-        try:
-            self.session.merge(bot)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.merge(bot)
 
+    @_retry_read
+    def get_bot_balance(self, bot_id: int):
+        with self._sessions() as session:
+            return _get_bot_balance(session, bot_id)
+
+    @_retry_read
+    def get_bots_by_account(self, account_no: str):
+        with self._sessions() as session:
+            return (
+                session.query(Bot)
+                .options(joinedload(Bot.strategy))
+                .filter_by(account_no=account_no)
+                .order_by(Bot.bot_id)
+                .all()
+            )
+
+    @_retry_read
     def get_bot_data(self, account_no: str, strategy_id: int):
-        bot = (
-            self.session.query(Bot)
-            .filter_by(account_no=account_no, strategy_id=strategy_id)
-            .first()
-        )
+        with self._sessions() as session:
+            bot = (
+                session.query(Bot)
+                .filter_by(account_no=account_no, strategy_id=strategy_id)
+                .first()
+            )
         if not bot:
             raise ValueError(
                 f"Bot with account '{account_no}' and strategy_id {strategy_id} not found"
@@ -71,101 +357,82 @@ class DB:
         return bot
 
     # Signal table
+    @_retry_read
     def check_duplicate_signal(self, signal: Signal):
-
-        query = select(Signal).where(
-            and_(
-                Signal.bot_id == signal.bot_id,
-                Signal.symbol == signal.symbol,
-                Signal.type == signal.type,
-                Signal.position_type == signal.position_type,
-                Signal.status == OrderStatus.Pending,
-            )
-        )
-
-        result = self.session.execute(query).scalars().first()
-        return result is not None
+        query = duplicate_signal_query(signal)
+        with self._sessions() as session:
+            return session.execute(query).scalars().first() is not None
 
     def add_signal(self, signal: Signal):
-        try:
-            self.session.add(signal)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.add(signal)
+
+    def add_signals(self, signals: list[Signal]):
+        with self._sessions.begin() as session:
+            session.add_all(signals)
 
+    @_retry_read
     def get_pending_signals(self, bot_id: int):
-        query = select(Signal).where(
-            Signal.bot_id == bot_id, Signal.status != OrderStatus.Open
-        )
-        result = self.session.execute(query).scalars().all()
-        return result
+        query = pending_signals_query(bot_id)
+        with self._sessions() as session:
+            return session.execute(query).scalars().all()
 
     def update_signal_status(self, signal_id: int, new_status: OrderStatus):
-        try:
-            stmt = (
-                update(Signal)
-                .where(Signal.signal_id == signal_id)
-                .values(status=new_status)
-            )
-            self.session.execute(stmt)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        stmt = (
+            update(Signal)
+            .where(Signal.signal_id == signal_id)
+            .values(status=new_status)
+        )
+        with self._sessions.begin() as session:
+            session.execute(stmt)
 
     # Trade table
     def add_trade(self, trade: Trade):
-        try:
-            self.session.add(trade)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.add(trade)
 
+    @_retry_read
     def get_trades_by_account(self, account_no: str):
-        return self.session.query(Trade).filter_by(account_no=account_no).all()
+        with self._sessions() as session:
+            return session.query(Trade).filter_by(account_no=account_no).all()
 
     # Transaction table
     def add_transaction(self, transaction: Transaction):
-        try:
-            self.session.add(transaction)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.add(transaction)
 
     # Portfolio table
+    @_retry_read
     def get_portfolios_by_account(self, account_no: str):
-        return self.session.query(Portfolio).filter_by(account_no=account_no).all()
+        with self._sessions() as session:
+            return session.query(Portfolio).filter_by(account_no=account_no).all()
 
+    @_retry_read
     def get_portfolio(self, account_no: str, symbol: str):
-        return (
-            self.session.query(Portfolio)
-            .filter_by(account_no=account_no, symbol=symbol)
-            .first()
-        )
+        query = portfolio_query(account_no, symbol)
+        with self._sessions() as session:
+            return session.execute(query).scalars().first()
 
     def update_portfolio(self, portfolio: Portfolio):
-        try:
-            self.session.merge(portfolio)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.merge(portfolio)
 
     def add_portfolio(self, portfolio: Portfolio):
-        try:
-            self.session.add(portfolio)
-            self.session.commit()
-        except IntegrityError:
-            self.session.rollback()
-            raise
+        with self._sessions.begin() as session:
+            session.add(portfolio)
 
-    def get_last_trade_by_symbol(self, account_no: str, symbol: str) -> Trade | None:
-        return (
-            self.session.query(Trade)
-            .filter(Trade.account_no == account_no, Trade.symbol == symbol)
-            .order_by(Trade.trade_date.desc())
-            .first()
+    @_retry_read
+    def get_last_trade_dates(self, account_no: str, symbols: list[str]) -> dict:
+        query = (
+            select(Trade.symbol, func.max(Trade.trade_date))
+            .where(Trade.account_no == account_no, Trade.symbol.in_(symbols))
+            .group_by(Trade.symbol)
         )
+        with self._sessions() as session:
+            return dict(session.execute(query).all())
+
+    @_retry_read
+    def get_last_trade_by_symbol(self, account_no: str, symbol: str) -> Trade | None:
+        query = last_trade_query(account_no, symbol)
+        with self._sessions() as session:
+            return session.execute(query).scalars().first()
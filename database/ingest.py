@@ -0,0 +1,283 @@
+import argparse
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import column, or_, select, table
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config.settings import settings
+from core.metrics import metrics
+from database.model import OHLCV
+from database.ohlcv_cache import OHLCVCache
+from database.partitions import ensure_range_partitions, is_partitioned
+
+COLUMNS = ["symbol", "date", "open", "high", "low", "close", "volume"]
+PRICES = ["open", "high", "low", "close"]
+# ohlcv.volume is a 32-bit integer
+MAX_VOLUME = 2**31 - 1
+# Filled by COPY, one per connection and emptied at the end of every batch
+STAGE_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS ohlcv_stage "
+    "(LIKE ohlcv INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+)
+stage = table("ohlcv_stage", *(column(name) for name in COLUMNS))
+
+
+def read_csv(path: str, batch_rows: int):
+    for chunk in pd.read_csv(path, chunksize=batch_rows):
+        yield _with_symbol(chunk, path)
+
+
+def read_parquet(path: str, batch_rows: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Reading Parquet files needs pyarrow installed") from error
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        yield _with_symbol(batch.to_pandas(), path)
+
+
+def read_files(paths: list[str], batch_rows: int):
+    for path in paths:
+        print(f"Reading {path}")
+        if path.endswith((".parquet", ".pq")):
+            yield from read_parquet(path, batch_rows)
+        else:
+            yield from read_csv(path, batch_rows)
+
+
+def synthetic_feed(n_symbols: int, n_days: int, seed: int = 0, group: int = 50):
+    # Stand-in feed of random walk bars, generated a group of symbols at a time
+    from benchmarks.synthetic import generate_ohlcv
+
+    for first in range(0, n_symbols, group):
+        frames = generate_ohlcv(
+            min(group, n_symbols - first), n_days, seed=seed + first
+        )
+        for index, frame in enumerate(frames.values()):
+            yield frame.reset_index().assign(symbol=f"SYN{first + index:04d}")
+
+
+def _with_symbol(frame: pd.DataFrame, path: str) -> pd.DataFrame:
+    # Single-symbol files may leave the symbol out, the file name is used
+    frame.columns = frame.columns.str.strip().str.lower()
+    if "symbol" not in frame:
+        frame["symbol"] = os.path.basename(path).split(".")[0]
+    return frame
+
+
+def validate(frame: pd.DataFrame) -> tuple[pd.DataFrame, int, int]:
+    # Returns the clean bars plus the number of rejected and duplicate rows.
+    # The last bar of a (symbol, date) wins
+    missing = [name for name in COLUMNS if name not in frame]
+    if missing:
+        raise ValueError(f"Missing OHLCV columns: {', '.join(missing)}")
+    frame = pd.DataFrame(
+        {
+            "symbol": frame["symbol"].astype(str).str.strip().str.upper(),
+            "date": pd.to_datetime(frame["date"], errors="coerce").dt.normalize(),
+            **{
+                name: pd.to_numeric(frame[name], errors="coerce")
+                for name in PRICES + ["volume"]
+            },
+        }
+    )
+    prices = frame[PRICES]
+    valid = (
+        frame["date"].notna()
+        & (frame["symbol"] != "")
+        & prices.notna().all(axis=1)
+        & (prices > 0).all(axis=1)
+        & (frame["high"] >= prices.max(axis=1))
+        & (frame["low"] <= prices.min(axis=1))
+        & frame["volume"].between(0, MAX_VOLUME)
+    )
+    rejected = int((~valid).sum())
+    frame = frame[valid]
+    deduplicated = frame.drop_duplicates(["symbol", "date"], keep="last")
+    deduplicated = deduplicated.astype({"volume": np.int64})
+    return (
+        deduplicated.sort_values(["symbol", "date"], ignore_index=True),
+        rejected,
+        len(frame) - len(deduplicated),
+    )
+
+
+def _batches(frames, batch_rows: int):
+    pending, size = [], 0
+    for frame in frames:
+        pending.append(frame)
+        size += len(frame)
+        if size >= batch_rows:
+            yield pd.concat(pending, ignore_index=True)
+            pending, size = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def _upsert(insert):
+    # Existing bars are only rewritten when a value actually differs, so
+    # unchanged rows produce no new row versions and aren't returned
+    excluded = insert.excluded
+    ohlcv = OHLCV.__table__
+    values = PRICES + ["volume"]
+    return insert.on_conflict_do_update(
+        index_elements=[ohlcv.c.symbol, ohlcv.c.date],
+        set_={name: excluded[name] for name in values},
+        where=or_(*(ohlcv.c[name].is_distinct_from(excluded[name]) for name in values)),
+    ).returning(ohlcv.c.symbol, ohlcv.c.date)
+
+
+def _copy_batch(connection, batch: pd.DataFrame) -> list:
+    # COPY into the staging table, then one set-based upsert into ohlcv
+    buffer = io.StringIO()
+    batch.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d")
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(STAGE_DDL)
+        cursor.copy_expert(
+            f"COPY ohlcv_stage ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+    insert = postgresql.insert(OHLCV.__table__).from_select(
+        COLUMNS, select(*(stage.c[name] for name in COLUMNS))
+    )
+    return connection.execute(_upsert(insert)).all()
+
+
+def _insert_batch(connection, batch: pd.DataFrame) -> list:
+    # Multi-row INSERT ... ON CONFLICT for databases without COPY
+    insert = (
+        postgresql.insert(OHLCV.__table__)
+        if connection.dialect.name == "postgresql"
+        else sqlite.insert(OHLCV.__table__)
+    )
+    records = batch.assign(date=batch["date"].dt.date).to_dict("records")
+    return connection.execute(_upsert(insert), records).all()
+
+
+def ingest(
+    frames,
+    engine=None,
+    batch_rows: int = 100_000,
+    ohlcv_cache: OHLCVCache | None = None,
+    use_copy: bool = True,
+) -> dict:
+    if engine is None:
+        from database import engine
+    postgres = engine.dialect.name == "postgresql"
+    use_copy = use_copy and postgres
+    with engine.connect() as connection:
+        partitioned = postgres and is_partitioned(connection, "ohlcv")
+    partition_years = set()
+
+    stats = {"rows": 0, "rejected": 0, "duplicates": 0, "written": 0}
+    changed_from = {}
+    start = time.perf_counter()
+    for raw in _batches(frames, batch_rows):
+        batch, rejected, duplicates = validate(raw)
+        stats["rows"] += len(raw)
+        stats["rejected"] += rejected
+        stats["duplicates"] += duplicates
+        if batch.empty:
+            continue
+
+        with metrics.timer("ohlcv_ingest_batch"), engine.begin() as connection:
+            years = set(batch["date"].dt.year.unique().tolist()) - partition_years
+            if partitioned and years:
+                ensure_range_partitions(
+                    connection,
+                    "ohlcv",
+                    "date",
+                    f"{min(years)}-01-01",
+                    f"{max(years)}-01-01",
+                    "year",
+                )
+                partition_years |= years
+            if use_copy:
+                changed = _copy_batch(connection, batch)
+            else:
+                changed = _insert_batch(connection, batch)
+
+        stats["written"] += len(changed)
+        metrics.inc("ohlcv_ingest_rows", len(batch))
+        metrics.inc("ohlcv_ingest_written", len(changed))
+        for symbol, first_date in (
+            pd.DataFrame(changed, columns=["symbol", "date"])
+            .groupby("symbol")["date"]
+            .min()
+            .items()
+        ):
+            if symbol not in changed_from or first_date < changed_from[symbol]:
+                changed_from[symbol] = first_date
+        elapsed = time.perf_counter() - start
+        print(
+            f"{stats['rows']} rows read, {stats['written']} written, "
+            f"{stats['rows'] / elapsed:,.0f} rows/s"
+        )
+
+    # Cached history is cut back to the first changed bar, the next sync
+    # refetches from there. Indicator caches key on the bars themselves
+    if ohlcv_cache is not None:
+        for symbol, first_date in changed_from.items():
+            ohlcv_cache.truncate(symbol, first_date)
+
+    stats["symbols_changed"] = len(changed_from)
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m database.ingest",
+        description="Bulk upsert OHLCV bars from CSV/Parquet files or a synthetic feed",
+    )
+    parser.add_argument("paths", nargs="*", help="CSV or Parquet files")
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument(
+        "--no-copy",
+        action="store_true",
+        help="use multi-row INSERT instead of COPY on Postgres",
+    )
+    parser.add_argument(
+        "--synthetic",
+        nargs=2,
+        type=int,
+        metavar=("SYMBOLS", "DAYS"),
+        help="ingest a generated feed instead of files",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.paths and not args.synthetic:
+        parser.error("give files to ingest or --synthetic SYMBOLS DAYS")
+
+    if args.synthetic:
+        frames = synthetic_feed(*args.synthetic, seed=args.seed)
+    else:
+        frames = read_files(args.paths, args.batch_rows)
+    ohlcv_cache = (
+        OHLCVCache(settings.OHLCV_CACHE_DIR) if settings.OHLCV_CACHE_DIR else None
+    )
+    stats = ingest(
+        frames,
+        batch_rows=args.batch_rows,
+        ohlcv_cache=ohlcv_cache,
+        use_copy=not args.no_copy,
+    )
+    print(
+        f"Ingested {stats['rows']} rows in {stats['seconds']:.1f}s "
+        f"({stats['rows_per_second']:,.0f} rows/s): {stats['written']} inserted or "
+        f"updated across {stats['symbols_changed']} symbols, "
+        f"{stats['duplicates']} duplicates, {stats['rejected']} rejected"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import importlib
+import pkgutil
+import re
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+    text,
+)
+
+from database.migrations import versions
+
+# Migrations are modules named <4-digit version>_<name>.py in versions/, each
+# with an upgrade(connection) function. They only ever move forward
+VERSION_PATTERN = re.compile(r"^(\d{4})_(\w+)$")
+# Key of the Postgres advisory lock held while migrating, so two processes
+# starting at once don't both apply the same version
+LOCK_KEY = 7305161
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def discover() -> list[tuple[int, str, object]]:
+    migrations = {}
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        match = VERSION_PATTERN.match(module_info.name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version:04d}")
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations[version] = (version, match.group(2), module)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(connection) -> set[int]:
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _lock(connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY}
+        )
+
+
+def upgrade(engine, target: int = None) -> list[int]:
+    # Each migration runs in its own transaction together with its
+    # schema_migrations row, so a failed migration leaves nothing behind
+    applied = []
+    for version, name, module in discover():
+        if target is not None and version > target:
+            break
+        with engine.begin() as connection:
+            _lock(connection)
+            if version in applied_versions(connection):
+                continue
+            module.upgrade(connection)
+            connection.execute(
+                insert(schema_migrations).values(version=version, name=name)
+            )
+        print(f"Applied migration {version:04d}_{name}")
+        applied.append(version)
+    return applied
+
+
+def status(engine) -> list[tuple[int, str, bool]]:
+    with engine.begin() as connection:
+        applied = applied_versions(connection)
+    return [(version, name, version in applied) for version, name, _ in discover()]
@@ -0,0 +1,39 @@
+import argparse
+import sys
+
+from database import engine
+from database.migrations import status, upgrade
+from database.migrations.plan_check import check_plans
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m database.migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--target", type=int, help="stop at this version")
+    commands.add_parser("status", help="list migrations and whether they ran")
+    commands.add_parser(
+        "check-plans", help="fail if a hot query plans a sequential scan"
+    )
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.target)
+        if not applied:
+            print("Schema is up to date")
+    elif args.command == "status":
+        for version, name, applied in status(engine):
+            print(f"{version:04d}_{name}: {'applied' if applied else 'pending'}")
+    else:
+        failed = False
+        for name, scans in check_plans(engine).items():
+            if scans:
+                failed = True
+                print(f"FAIL {name}: sequential scan on {', '.join(scans)}")
+            else:
+                print(f"ok   {name}")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
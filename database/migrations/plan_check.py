@@ -0,0 +1,60 @@
+import json
+from datetime import date
+
+from sqlalchemy import text
+
+from database.crud import (
+    duplicate_signal_query,
+    last_trade_query,
+    ohlcv_bulk_query,
+    pending_signals_query,
+    portfolio_query,
+)
+from database.model import OrderStatus, Signal, SideType
+
+
+def hot_queries() -> dict:
+    # The queries the bot runs on every order or bar, with placeholder values
+    signal = Signal(
+        bot_id=1,
+        symbol="CHECK",
+        type=SideType.buy,
+        position_type="check",
+        status=OrderStatus.Pending,
+    )
+    return {
+        "check_duplicate_signal": duplicate_signal_query(signal),
+        "get_pending_signals": pending_signals_query(1),
+        "get_portfolio": portfolio_query("CHECK", "CHECK"),
+        "get_last_trade_by_symbol": last_trade_query("CHECK", "CHECK"),
+        "get_ohlcv_bulk": ohlcv_bulk_query(
+            ["CHECK"], date.today().replace(month=1, day=1), date.today()
+        ),
+    }
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(_seq_scans(child))
+    return scans
+
+
+def check_plans(engine) -> dict[str, list[str]]:
+    # With sequential scans disabled Postgres still picks one when no index
+    # can serve the query, so any Seq Scan left in a plan means a missing
+    # index. Returns the tables scanned per query, empty when all is well
+    results = {}
+    with engine.connect() as connection:
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, query in hot_queries().items():
+            sql = query.compile(
+                dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+            )
+            row = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).one()
+            plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+            results[name] = _seq_scans(plan[0]["Plan"])
+        connection.rollback()
+    return results
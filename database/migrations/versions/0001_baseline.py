@@ -0,0 +1,7 @@
+from database.model import Base
+
+
+def upgrade(connection):
+    # Tables that already exist are left as they are. On an empty database this
+    # creates the current schema, later migrations then find their work done
+    Base.metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import text
+
+INDEXES = [
+    # DB.get_pending_signals
+    "CREATE INDEX IF NOT EXISTS ix_signal_bot_status ON signal (bot_id, status)",
+    # DB.check_duplicate_signal, which only looks at pending signals
+    "CREATE INDEX IF NOT EXISTS ix_signal_pending_dedup "
+    "ON signal (bot_id, symbol, type, position_type) WHERE status = 'Pending'",
+    # DB.get_last_trade_by_symbol, get_trades_by_account, get_last_trade_dates
+    "CREATE INDEX IF NOT EXISTS ix_trade_account_symbol_date "
+    "ON trade (account_no, symbol, trade_date DESC)",
+    # DB.get_portfolio, UnitOfWork.get_portfolio
+    "CREATE INDEX IF NOT EXISTS ix_portfolio_account_symbol "
+    "ON portfolio (account_no, symbol)",
+]
+
+
+def upgrade(connection):
+    for statement in INDEXES:
+        connection.execute(text(statement))
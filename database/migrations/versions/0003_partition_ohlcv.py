@@ -0,0 +1,56 @@
+import pandas as pd
+from sqlalchemy import text
+
+from database.partitions import (
+    ensure_default_partition,
+    ensure_range_partitions,
+    is_partitioned,
+)
+
+
+def upgrade(connection):
+    # ohlcv becomes range partitioned by year on date, so the date bounded
+    # bulk loads only scan the years they cover. Existing rows are copied over
+    today = pd.Timestamp.now().normalize()
+    if not is_partitioned(connection, "ohlcv"):
+        connection.execute(text("ALTER TABLE ohlcv RENAME TO ohlcv_unpartitioned"))
+        connection.execute(
+            text("ALTER INDEX ohlcv_pkey RENAME TO ohlcv_unpartitioned_pkey")
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE ohlcv (LIKE ohlcv_unpartitioned INCLUDING DEFAULTS) "
+                "PARTITION BY RANGE (date)"
+            )
+        )
+        connection.execute(text("ALTER TABLE ohlcv ADD PRIMARY KEY (symbol, date)"))
+        first, last = connection.execute(
+            text("SELECT min(date), max(date) FROM ohlcv_unpartitioned")
+        ).one()
+        ensure_range_partitions(
+            connection,
+            "ohlcv",
+            "date",
+            first or today,
+            max(pd.Timestamp(last or today), today) + pd.DateOffset(years=1),
+            "year",
+        )
+        ensure_default_partition(connection, "ohlcv")
+        connection.execute(text("INSERT INTO ohlcv SELECT * FROM ohlcv_unpartitioned"))
+        connection.execute(text("DROP TABLE ohlcv_unpartitioned"))
+    else:
+        ensure_range_partitions(
+            connection, "ohlcv", "date", today, today + pd.DateOffset(years=1), "year"
+        )
+        ensure_default_partition(connection, "ohlcv")
+
+    # ohlcv_bar is created partitioned but has no partitions yet
+    ensure_range_partitions(
+        connection,
+        "ohlcv_bar",
+        "timestamp",
+        today,
+        today + pd.DateOffset(months=12),
+        "month",
+    )
+    ensure_default_partition(connection, "ohlcv_bar")
@@ -8,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Enum,
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -29,7 +30,9 @@ class SideType(enum.Enum):
 
 
 class OHLCV(Base):
+    # Range partitioned by year on date, see DB.create_ohlcv_partitions
     __tablename__ = "ohlcv"
+    __table_args__ = {"postgresql_partition_by": "RANGE (date)"}
 
     symbol = Column(String, primary_key=True)
     date = Column(Date, primary_key=True)
@@ -41,6 +44,21 @@ class OHLCV(Base):
     volume = Column(Integer)
 
 
+class OHLCVBar(Base):
+    # Intraday bars at the base resolution (BAR_BASE_TIMEFRAME), timestamps in
+    # exchange time. Range partitioned by month, see DB.create_ohlcv_bar_partitions
+    __tablename__ = "ohlcv_bar"
+    __table_args__ = {"postgresql_partition_by": 'RANGE ("timestamp")'}
+
+    symbol = Column(String, primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    open = Column(Float(8))
+    high = Column(Float(8))
+    low = Column(Float(8))
+    close = Column(Float(8))
+    volume = Column(Integer)
+
+
 class Strategy(Base, TimestampMixin):
     __tablename__ = "strategy"
 
@@ -90,6 +108,8 @@ class Portfolio(Base, TimestampMixin):
     holding_volume = Column(Float, nullable=False)
     profit = Column(Float, nullable=False)
 
+    __table_args__ = (Index("ix_portfolio_account_symbol", account_no, symbol),)
+
     account = relationship("Account", back_populates="portfolios")
 
 
@@ -122,6 +142,20 @@ class Signal(Base, TimestampMixin):
     status = Column(Enum(OrderStatus), nullable=False, default=OrderStatus.Pending)
     transaction = relationship("Transaction", back_populates="signal", uselist=False)
 
+    # Indexes are created by migrations, see database/migrations/versions
+    __table_args__ = (
+        Index("ix_signal_bot_status", bot_id, status),
+        # Duplicate checks only ever look at pending signals
+        Index(
+            "ix_signal_pending_dedup",
+            bot_id,
+            symbol,
+            type,
+            position_type,
+            postgresql_where=status == OrderStatus.Pending,
+        ),
+    )
+
     bot = relationship("Bot", back_populates="signals")
     account = relationship("Account", back_populates="signals")
 
@@ -144,6 +178,10 @@ class Trade(Base, TimestampMixin):
     status = Column(Enum(OrderStatus), nullable=False)
     transaction = relationship("Transaction", back_populates="trade", uselist=False)
 
+    __table_args__ = (
+        Index("ix_trade_account_symbol_date", account_no, symbol, trade_date.desc()),
+    )
+
     account = relationship("Account", back_populates="trades")
 
 
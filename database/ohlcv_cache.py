@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+OHLCV_DTYPE = np.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+    ]
+)
+# Intraday bars keep the same fields with nanosecond timestamps
+BAR_DTYPE = np.dtype([("date", "datetime64[ns]")] + OHLCV_DTYPE.descr[1:])
+
+
+class OHLCVCache:
+    dtype = OHLCV_DTYPE
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.npy")
+
+    def read(self, symbol: str) -> np.ndarray | None:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def write(self, symbol: str, records: np.ndarray):
+        # Write to a temp file and swap it in so readers never see a partial file
+        path = self._path(symbol)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, records)
+        os.replace(tmp_path, path)
+
+    def append(self, symbol: str, records: np.ndarray):
+        cached = self.read(symbol)
+        if cached is not None and len(cached):
+            records = np.concatenate(
+                [cached, records[records["date"] > cached["date"][-1]]]
+            )
+        self.write(symbol, records)
+
+    def invalidate(self, symbol: str):
+        path = self._path(symbol)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def truncate(self, symbol: str, start_date):
+        # Drops cached rows from start_date on, the next sync refetches them
+        cached = self.read(symbol)
+        start = np.datetime64(pd.Timestamp(start_date)).astype(self.dtype["date"])
+        if cached is None or not len(cached) or cached["date"][-1] < start:
+            return
+        kept = np.array(cached[cached["date"] < start])
+        if len(kept):
+            self.write(symbol, kept)
+        else:
+            self.invalidate(symbol)
+
+    def _max_dates(self, db, symbols: list[str]) -> dict:
+        return db.get_ohlcv_max_dates(symbols)
+
+    def _fetch(self, db, symbols: list[str], start_date) -> dict[str, np.ndarray]:
+        return split_by_symbol(db.get_ohlcv_bulk(symbols, start_date=start_date))
+
+    def _next_start(self, last: np.datetime64):
+        return (last + 1).astype(object)
+
+    def sync(self, db, symbols: list[str]) -> dict[str, np.ndarray]:
+        latest_dates = self._max_dates(db, symbols)
+        records = {}
+        # Stale symbols grouped by the first missing date, one bulk query per group
+        missing = {}
+        for symbol in symbols:
+            db_last = latest_dates.get(symbol)
+            if db_last is None:
+                self.invalidate(symbol)
+                records[symbol] = np.empty(0, dtype=self.dtype)
+                continue
+
+            cached = self.read(symbol)
+            db_last = np.datetime64(db_last).astype(self.dtype["date"])
+            if cached is None or not len(cached) or cached["date"][-1] > db_last:
+                self.invalidate(symbol)
+                missing.setdefault(None, []).append(symbol)
+            elif cached["date"][-1] < db_last:
+                start_date = self._next_start(cached["date"][-1])
+                missing.setdefault(start_date, []).append(symbol)
+            else:
+                records[symbol] = cached
+
+        for start_date, group in missing.items():
+            fetched = self._fetch(db, group, start_date)
+            for symbol in group:
+                if symbol in fetched:
+                    self.append(symbol, fetched[symbol])
+                records[symbol] = self.read(symbol)
+                if records[symbol] is None:
+                    records[symbol] = np.empty(0, dtype=self.dtype)
+        return records
+
+
+class BarCache(OHLCVCache):
+    # Same file layout for intraday bars at the base resolution. Rows are
+    # fetched from the bar store in batches so a sync never holds more than
+    # one batch of Python tuples
+    dtype = BAR_DTYPE
+
+    def __init__(self, cache_dir: str, history_days: int):
+        super().__init__(cache_dir)
+        self.history_days = history_days
+
+    def _max_dates(self, db, symbols: list[str]) -> dict:
+        return db.get_ohlcv_bar_max_timestamps(symbols)
+
+    def _fetch(self, db, symbols: list[str], start_date) -> dict[str, np.ndarray]:
+        if start_date is None:
+            # A new cache only pulls the history that will be used
+            start_date = pd.Timestamp.now().normalize() - pd.Timedelta(
+                days=self.history_days
+            )
+        return fetch_bars(db, symbols, start=start_date)
+
+    def _next_start(self, last: np.datetime64):
+        return pd.Timestamp(last + 1)
+
+
+def fetch_bars(db, symbols: list[str], start=None, end=None) -> dict[str, np.ndarray]:
+    parts = {}
+    for rows in db.iter_ohlcv_bars(symbols, start=start, end=end):
+        for symbol, records in split_by_symbol(rows, BAR_DTYPE).items():
+            parts.setdefault(symbol, []).append(records)
+    return {symbol: np.concatenate(chunks) for symbol, chunks in parts.items()}
+
+
+def split_by_symbol(rows, dtype: np.dtype = OHLCV_DTYPE) -> dict[str, np.ndarray]:
+    # Rows are (symbol, date, open, high, low, close, volume) ordered by symbol, date
+    if not rows:
+        return {}
+    symbols, dates, *values = zip(*rows)
+    records = np.empty(len(rows), dtype=dtype)
+    records["date"] = np.array(dates, dtype=dtype["date"])
+    for column, column_values in zip(OHLCV_COLUMNS[1:], values):
+        records[column] = np.array(column_values, dtype="f8")
+
+    symbols = np.array(symbols)
+    starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+    ends = np.r_[starts[1:], len(symbols)]
+    return {symbols[start]: records[start:end] for start, end in zip(starts, ends)}
+
+
+def to_frame(records: np.ndarray) -> pd.DataFrame:
+    index = pd.DatetimeIndex(records["date"].astype("datetime64[ns]"), name="date")
+    return pd.DataFrame(
+        {column: records[column] for column in OHLCV_COLUMNS[1:]}, index=index
+    )
@@ -0,0 +1,69 @@
+import pandas as pd
+from sqlalchemy import text
+
+# Partition interval -> (date_range frequency, offset to the upper bound,
+# partition name suffix)
+INTERVALS = {
+    "year": ("YS", pd.offsets.YearBegin(), "%Y"),
+    "month": ("MS", pd.offsets.MonthBegin(), "%Y_%m"),
+}
+
+
+def ensure_range_partitions(
+    connection, table: str, column: str, start_date, end_date, interval: str
+) -> list[str]:
+    # Creates the missing partitions of a range partitioned table between two
+    # dates. Rows that landed in the default partition for a new range are
+    # moved into it, so the attach doesn't fail on overlapping rows
+    freq, offset, suffix = INTERVALS[interval]
+    first = pd.Timestamp(start_date).to_period(freq[0]).start_time
+    has_default = _exists(connection, f"{table}_default")
+    created = []
+    for lower in pd.date_range(first, pd.Timestamp(end_date), freq=freq):
+        name = f"{table}_{lower:{suffix}}"
+        if _exists(connection, name):
+            continue
+        upper = lower + offset
+        bounds = {"lower": lower.to_pydatetime(), "upper": upper.to_pydatetime()}
+        connection.execute(
+            text(
+                f"CREATE TABLE {name} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        if has_default:
+            connection.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {table}_default "
+                    f'WHERE "{column}" >= :lower AND "{column}" < :upper RETURNING *) '
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+        connection.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def ensure_default_partition(connection, table: str):
+    # Catches rows outside every range instead of failing the insert
+    connection.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+    )
+
+
+def is_partitioned(connection, table: str) -> bool:
+    query = text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    )
+    return connection.execute(query, {"table": table}).first() is not None
+
+
+def _exists(connection, name: str) -> bool:
+    query = text("SELECT to_regclass(:name)")
+    return connection.execute(query, {"name": name}).scalar() is not None
@@ -1,11 +1,15 @@
+from core.orchestrator import BotOrchestrator
 from core.strategy.sma_strategy import SMAStrategy
-from core.trading_bot import TradingBot
 from models.trading_bot import TradingMode
 
+# Strategy name in the strategy table -> class, every bot of the account whose
+# strategy is listed here is run
+STRATEGIES = {"SMA": SMAStrategy}
+
 
 def main():
-    bot = TradingBot(strategy_class=SMAStrategy, mode=TradingMode.Live)
-    bot.live_trading()
+    orchestrator = BotOrchestrator(STRATEGIES, mode=TradingMode.Live)
+    orchestrator.live_trading()
 
 
 if __name__ == "__main__":
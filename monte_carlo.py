@@ -0,0 +1,22 @@
+from core.monte_carlo import print_monte_carlo, run_monte_carlo
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+N_PATHS = 10000
+SLIPPAGE = 0.001
+BLOCK_SIZE = 20
+
+
+if __name__ == "__main__":
+    bot = TradingBot(strategy_class=SMAStrategy, mode=TradingMode.Backtest)
+    bot.backtest()
+    results = run_monte_carlo(
+        bot.ledgers,
+        bot.equity_curve,
+        bot.initial_budget,
+        n_paths=N_PATHS,
+        slippage=SLIPPAGE,
+        block_size=BLOCK_SIZE,
+    )
+    print_monte_carlo(results)
@@ -0,0 +1,15 @@
+from core.strategy.sma_strategy import SMAStrategy
+from core.sweep import run_sweep
+
+PARAM_GRID = {
+    "short_window": [20, 50, 100],
+    "long_window": [150, 200, 250],
+    "rsi_period": [14],
+    "rsi_buy_threshold": [25, 30, 35],
+    "rsi_sell_threshold": [65, 70, 75],
+}
+
+
+if __name__ == "__main__":
+    results = run_sweep(SMAStrategy, PARAM_GRID)
+    print(results.to_string())
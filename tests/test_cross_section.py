@@ -0,0 +1,34 @@
+from benchmarks.synthetic import InMemoryDB, generate_ohlcv
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+
+class RSIRankStrategy(SMAStrategy):
+    # Reads an indicator column, not just OHLCV
+    def score_cross_section(self, panel_slice):
+        return panel_slice.field("RSI") - 50
+
+
+def test_live_and_backtest_rank_the_same():
+    frames = generate_ohlcv(6, 120, seed=3)
+    bot = TradingBot(
+        RSIRankStrategy, TradingMode.Backtest, verbose=False, db=InMemoryDB(frames)
+    )
+    bot.load_backtest_data()
+    stocks = list(frames)
+    bot._precompute_indicators()
+    panel = bot._cross_section_panel(stocks)
+
+    # Nothing is precomputed in live mode
+    bot._indicator_frames = {}
+    bot._panel = None
+    buys = 0
+    for date in panel.timestamps[-30:]:
+        order, buyable = bot._rank_cross_section(panel.at(panel.time_index(date)))
+        ranked, live_buyable = bot._rank_live_cross_section(date, stocks)
+
+        assert ranked == [stocks[index] for index in order]
+        assert live_buyable == {stocks[index] for index in order if buyable[index]}
+        buys += len(live_buyable)
+    assert 0 < buys < 30 * len(stocks)
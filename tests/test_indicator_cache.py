@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.indicator_cache import IndicatorCache, _nbytes
+
+
+def make_bars(seed: int, n: int = 200) -> pd.DataFrame:
+    close = 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+    return pd.DataFrame(
+        {"close": close}, index=pd.date_range("2024-01-01", periods=n, name="date")
+    )
+
+
+def make_cache(entries: float, **kwargs) -> IndicatorCache:
+    size = _nbytes(IndicatorCache().compute(make_bars(0), "sma", window=5))
+    return IndicatorCache(max_bytes=int(size * entries), **kwargs)
+
+
+def test_repeated_lookups_hit():
+    cache = make_cache(4)
+    bars = make_bars(0)
+    first = cache.get(bars, "sma", window=5)
+
+    assert cache.get(bars.copy(), "sma", window=5) is first
+    cache.get(bars, "sma", window=10)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_revised_bar_is_a_new_entry():
+    cache = make_cache(4)
+    bars = make_bars(0)
+    cache.get(bars, "sma", window=5)
+    revised = bars.copy()
+    revised.iloc[50, 0] += 1
+
+    value = cache.get(revised, "sma", window=5)
+    assert cache.misses == 2
+    pd.testing.assert_series_equal(value, revised["close"].rolling(5).mean())
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(2.5)
+    first, second, third = make_bars(1), make_bars(2), make_bars(3)
+    cache.get(first, "sma", window=5)
+    cache.get(second, "sma", window=5)
+    cache.get(first, "sma", window=5)
+    cache.get(third, "sma", window=5)
+
+    assert cache.evictions == 1
+    assert cache.stats()["entries"] == 2
+    cache.get(first, "sma", window=5)
+    assert cache.hits == 2
+    # Dropped without a spill dir
+    cache.get(second, "sma", window=5)
+    assert cache.misses == 4
+    assert cache.spills == 0
+
+
+def test_evicted_entries_spill_to_disk(tmp_path):
+    cache = make_cache(1.5, spill_dir=str(tmp_path))
+    first, second = make_bars(1), make_bars(2)
+    expected = cache.get(first, "sma", window=5)
+    cache.get(second, "sma", window=5)
+
+    assert cache.spills == 1
+    spill_dir = os.path.join(tmp_path, f"indicators-{os.getpid()}")
+    assert len(os.listdir(spill_dir)) == 1
+
+    pd.testing.assert_series_equal(cache.get(first, "sma", window=5), expected)
+    assert cache.disk_hits == 1
+    # Loaded back into memory, which spilled the other entry in its place
+    assert cache.stats()["spilled_entries"] == 1
+    assert len(os.listdir(spill_dir)) == 1
+    cache.clear()
+    assert os.listdir(spill_dir) == []
+
+
+def test_spill_dir_is_bounded(tmp_path):
+    size = _nbytes(IndicatorCache().compute(make_bars(0), "sma", window=5))
+    cache = IndicatorCache(
+        max_bytes=int(size * 1.5),
+        spill_dir=str(tmp_path),
+        max_spill_bytes=int(size * 1.5),
+    )
+    for seed in range(4):
+        cache.get(make_bars(seed), "sma", window=5)
+
+    assert cache.spills == 3
+    assert cache.stats()["spilled_entries"] == 1
+    assert len(os.listdir(os.path.join(tmp_path, f"indicators-{os.getpid()}"))) == 1
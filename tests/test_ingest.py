@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from database.ingest import MAX_VOLUME, validate
+
+GOOD = {"open": 10, "high": 11, "low": 9, "close": 10.5, "volume": 1000}
+
+
+def row(symbol="AAA", date="2024-01-02", **values) -> dict:
+    return {"symbol": symbol, "date": date, **GOOD, **values}
+
+
+def test_later_duplicates_win():
+    clean, rejected, duplicates = validate(
+        pd.DataFrame(
+            [
+                row(close=10.1),
+                row(symbol=" aaa ", close=10.2),
+                row(date="2024-01-03"),
+            ]
+        )
+    )
+
+    assert (rejected, duplicates) == (0, 1)
+    assert clean["symbol"].tolist() == ["AAA", "AAA"]
+    assert clean["date"].tolist() == [
+        pd.Timestamp("2024-01-02"),
+        pd.Timestamp("2024-01-03"),
+    ]
+    assert clean["close"].tolist() == [10.2, 10.5]
+    assert clean["volume"].dtype == "int64"
+
+
+def test_invalid_bars_are_rejected():
+    frame = pd.DataFrame(
+        [
+            row(),
+            row(date="not a date"),
+            row(symbol=" "),
+            row(close=None),
+            row(open=0),
+            row(high=10.2),
+            row(low=10.6),
+            row(volume=-1),
+            row(volume=MAX_VOLUME + 1),
+            row(close="n/a"),
+        ]
+    )
+    clean, rejected, duplicates = validate(frame)
+
+    assert (len(clean), rejected, duplicates) == (1, 9, 0)
+
+
+def test_rejected_rows_are_not_counted_as_duplicates():
+    clean, rejected, duplicates = validate(
+        pd.DataFrame([row(), row(high=1), row(volume=5)])
+    )
+
+    assert (rejected, duplicates) == (1, 1)
+    assert clean["volume"].tolist() == [5]
+
+
+def test_clean_bars_are_sorted_by_symbol_and_date():
+    clean, _, _ = validate(
+        pd.DataFrame(
+            [
+                row("BBB", "2024-01-03"),
+                row("AAA", "2024-01-03"),
+                row("BBB", "2024-01-02"),
+            ]
+        )
+    )
+
+    assert list(zip(clean["symbol"], clean["date"].dt.day)) == [
+        ("AAA", 3),
+        ("BBB", 2),
+        ("BBB", 3),
+    ]
+
+
+def test_missing_columns_are_an_error():
+    with pytest.raises(ValueError, match="Missing OHLCV columns: volume"):
+        validate(pd.DataFrame([row()]).drop(columns="volume"))
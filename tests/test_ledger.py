@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from core.ledger import BUY, SELL, TradeLedger
+
+
+def test_fills_round_trip_through_the_ledger():
+    ledger = TradeLedger(capacity=1)
+    ledger.append(
+        "buy", pd.Timestamp("2024-01-02"), 100, 10.0, 1.5, reason="strong_buy"
+    )
+    ledger.extend(
+        ["sell", "buy"],
+        pd.to_datetime(["2024-01-03", "2024-01-04"]),
+        [40, 60],
+        [11.0, 12.0],
+        commissions=[0.5, 0.7],
+        reasons=["moderate_sell", "strong_buy"],
+    )
+
+    # Grown past its capacity without losing a fill
+    assert len(ledger) == 3
+    assert ledger.column("side").tolist() == [BUY, SELL, BUY]
+    assert ledger.column("date").tolist() == list(
+        pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]).asi8
+    )
+    assert ledger.column("volume").tolist() == [100, 40, 60]
+    assert ledger.column("price").tolist() == [10.0, 11.0, 12.0]
+    assert ledger.column("commission").tolist() == [1.5, 0.5, 0.7]
+    assert ledger.reason_labels().tolist() == [
+        "strong_buy",
+        "moderate_sell",
+        "strong_buy",
+    ]
+    assert ledger.reasons == ["strong_buy", "moderate_sell"]
+
+
+def test_defaults_for_commission_and_reason():
+    ledger = TradeLedger()
+    ledger.extend(["buy"], [pd.Timestamp("2024-01-02")], [10], [5.0])
+
+    assert ledger.column("commission").tolist() == [0.0]
+    assert ledger.reason_labels().tolist() == ["unknown"]
+
+
+def test_copy_is_independent():
+    ledger = TradeLedger()
+    ledger.append("buy", pd.Timestamp("2024-01-02"), 100, 10.0, reason="portfolio")
+    copy = ledger.copy()
+    copy.append("sell", pd.Timestamp("2024-01-03"), 100, 11.0, reason="history")
+
+    assert len(ledger) == 1
+    assert ledger.reasons == ["portfolio"]
+    assert copy.reason_labels().tolist() == ["portfolio", "history"]
+    np.testing.assert_array_equal(copy.records[:1], ledger.records)
+
+
+def test_sort_by_date_keeps_the_order_of_same_day_fills():
+    ledger = TradeLedger()
+    ledger.append("sell", pd.Timestamp("2024-01-03"), 1, 12.0, reason="a")
+    ledger.append("buy", pd.Timestamp("2024-01-02"), 2, 10.0, reason="b")
+    ledger.append("sell", pd.Timestamp("2024-01-02"), 3, 11.0, reason="c")
+    ledger.sort_by_date()
+
+    assert ledger.column("volume").tolist() == [2, 3, 1]
+    assert ledger.reason_labels().tolist() == ["b", "c", "a"]
@@ -0,0 +1,113 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, update
+
+from core.live_state import LiveState
+from database.model import Bot, Portfolio, SideType, Trade
+
+
+def make_trade(side: SideType, volume: float, price: float) -> Trade:
+    return Trade(
+        account_no="TEST",
+        order_no="1",
+        symbol="AAA",
+        type=side,
+        price=price,
+        volume=volume,
+        commission=0,
+        vat=0,
+        wht=0,
+        trade_date=date(2024, 1, 2),
+    )
+
+
+def add_position(db, volume: float, price: float) -> int:
+    with db._sessions.begin() as session:
+        portfolio = Portfolio(
+            account_no="TEST",
+            symbol="AAA",
+            entry_price=price,
+            entry_volume=volume,
+            average_cost=price,
+            holding_volume=volume,
+            profit=0,
+        )
+        session.add(portfolio)
+        session.flush()
+        return portfolio.portfolio_id
+
+
+def portfolios(db) -> list[tuple]:
+    with db._sessions() as session:
+        return session.query(Portfolio.holding_volume, Portfolio.average_cost).all()
+
+
+@pytest.fixture
+def live_state(db, bot_info):
+    alerts = []
+    state = LiveState("TEST", bot_info.bot_id, alert=alerts.append)
+    state.alerts = alerts
+    return state
+
+
+def apply_fill(db, state: LiveState, trade: Trade):
+    with db.unit_of_work() as uow:
+        state.apply_fill(uow, trade)
+
+
+def test_buy_opens_a_position(db, live_state):
+    live_state.hydrate(db, ["AAA"])
+    apply_fill(db, live_state, make_trade(SideType.buy, 100, 10.0))
+
+    assert portfolios(db) == [(100, 10.0)]
+    assert live_state.holding_volume("AAA") == 100
+    assert live_state.available_budget == 100_000 - 1000
+    assert live_state.alerts == []
+
+
+def test_position_opened_elsewhere_is_not_inserted_twice(db, live_state):
+    live_state.hydrate(db, ["AAA"])
+    add_position(db, 100, 10.0)
+    apply_fill(db, live_state, make_trade(SideType.buy, 100, 12.0))
+
+    assert portfolios(db) == [(200, 11.0)]
+    assert live_state.holding_volume("AAA") == 200
+    assert "changed outside this process" in live_state.alerts[-1]
+
+
+def test_position_changed_elsewhere_is_reconciled(db, live_state):
+    portfolio_id = add_position(db, 100, 10.0)
+    live_state.hydrate(db, ["AAA"])
+    with db._sessions.begin() as session:
+        session.execute(
+            update(Portfolio)
+            .where(Portfolio.portfolio_id == portfolio_id)
+            .values(holding_volume=300)
+        )
+    apply_fill(db, live_state, make_trade(SideType.sell, 50, 12.0))
+
+    assert portfolios(db) == [(250, 10.0)]
+    assert live_state.holding_volume("AAA") == 250
+
+
+def test_position_removed_elsewhere_is_opened_again(db, live_state):
+    add_position(db, 100, 10.0)
+    live_state.hydrate(db, ["AAA"])
+    with db._sessions.begin() as session:
+        session.execute(delete(Portfolio))
+    apply_fill(db, live_state, make_trade(SideType.buy, 40, 12.0))
+
+    assert portfolios(db) == [(40, 12.0)]
+    assert live_state.holding_volume("AAA") == 40
+    assert "changed outside this process" in live_state.alerts[-1]
+
+
+def test_budget_changed_elsewhere_is_reconciled(db, live_state):
+    live_state.hydrate(db, ["AAA"])
+    with db._sessions.begin() as session:
+        session.execute(update(Bot).values(available_budget=50_000))
+    apply_fill(db, live_state, make_trade(SideType.buy, 100, 10.0))
+
+    assert live_state.available_budget == 50_000 - 1000
+    assert "budget changed outside this process" in live_state.alerts[-1]
@@ -0,0 +1,66 @@
+from datetime import date, datetime, time
+
+import numpy as np
+
+from core.market_calendar import MarketCalendar
+from models.market import MarketPhase
+
+PHASES = {
+    "Pre-Open": {"start": ["09:30:00"], "end": "10:00:00"},
+    "Market Open": {"start": ["10:00:00"], "end": "12:30:00"},
+    "Market Close": {"start": ["16:30:00"], "end": "17:00:00"},
+}
+# Tuesday, 2 January 2024
+HOLIDAYS = ["2024-01-02"]
+
+
+def make_calendar() -> MarketCalendar:
+    return MarketCalendar(PHASES, HOLIDAYS, start="2023-12-01", end="2024-02-01")
+
+
+def test_weekends_and_holidays_are_not_trading_days():
+    calendar = make_calendar()
+
+    assert calendar.is_trading_day(date(2024, 1, 1))
+    assert not calendar.is_trading_day(date(2024, 1, 2))
+    assert not calendar.is_trading_day(date(2024, 1, 6))
+    assert calendar.is_trading_days(
+        ["2024-01-01", "2024-01-02", "2024-01-06", "2024-01-08"]
+    ).tolist() == [True, False, False, True]
+    assert calendar.next_trading_day(date(2024, 1, 1)) == date(2024, 1, 3)
+    assert calendar.previous_trading_day(date(2024, 1, 3)) == date(2024, 1, 1)
+    assert calendar.previous_trading_day(date(2024, 1, 8)) == date(2024, 1, 5)
+    assert calendar.trading_days_between(
+        date(2023, 12, 29), date(2024, 1, 3)
+    ).tolist() == [date(2023, 12, 29), date(2024, 1, 1), date(2024, 1, 3)]
+
+
+def test_phases_by_time_of_day():
+    calendar = make_calendar()
+
+    assert calendar.phase(time(9, 0)) == MarketPhase.OutOfWorkingHours
+    assert calendar.phase(time(9, 30)) == MarketPhase.PreOpen
+    assert calendar.phase(datetime(2024, 1, 3, 10, 0)) == MarketPhase.MarketOpen
+    # Ends are exclusive
+    assert calendar.phase(time(12, 30)) == MarketPhase.OutOfWorkingHours
+    assert calendar.phase(time(14, 5)) == MarketPhase.OutOfWorkingHours
+    assert calendar.phase(time(16, 59, 59)) == MarketPhase.MarketClose
+    assert calendar.phase(time(17, 0)) == MarketPhase.OutOfWorkingHours
+
+    seconds = np.array([9 * 3600, 9 * 3600 + 1800, 11 * 3600, 13 * 3600])
+    assert calendar.phases(seconds).tolist() == [
+        MarketPhase.OutOfWorkingHours,
+        MarketPhase.PreOpen,
+        MarketPhase.MarketOpen,
+        MarketPhase.OutOfWorkingHours,
+    ]
+
+
+def test_transitions_include_the_ends_of_phases():
+    assert make_calendar().transitions == [
+        (time(9, 30), MarketPhase.PreOpen),
+        (time(10, 0), MarketPhase.MarketOpen),
+        (time(12, 30), MarketPhase.OutOfWorkingHours),
+        (time(16, 30), MarketPhase.MarketClose),
+        (time(17, 0), MarketPhase.OutOfWorkingHours),
+    ]
@@ -0,0 +1,31 @@
+from benchmarks.synthetic import InMemoryDB, generate_ohlcv
+from config.settings import settings
+from core.market_data import load_ohlcv
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+
+def test_history_is_cut_to_the_configured_years():
+    frames = generate_ohlcv(2, 3000, seed=1)
+    loaded = load_ohlcv(InMemoryDB(frames), None, list(frames))
+
+    for symbol, df in loaded.items():
+        assert df.index[-1] == frames[symbol].index[-1]
+        years = (df.index[-1] - df.index[0]).days / 365.25
+        assert (
+            settings.OHLCV_HISTORY_YEARS - 0.1 < years <= settings.OHLCV_HISTORY_YEARS
+        )
+
+
+def test_backtests_can_load_older_history():
+    frames = generate_ohlcv(2, 3000, seed=1)
+    history_start = frames["SYN0000"].index[100].date()
+    bot = TradingBot(
+        SMAStrategy, TradingMode.Backtest, verbose=False, db=InMemoryDB(frames)
+    )
+    bot.load_backtest_data(history_start=history_start)
+
+    for symbol, df in bot._dataframes.items():
+        assert df.index[0].date() == history_start
+        assert len(df) == len(frames[symbol]) - 100
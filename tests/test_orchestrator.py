@@ -0,0 +1,36 @@
+import pytest
+
+from core.orchestrator import BotOrchestrator
+from core.strategy.sma_strategy import SMAStrategy
+from database.model import Bot
+from models.trading_bot import TradingMode
+
+
+@pytest.fixture
+def overlapping_bots(db, bot_info):
+    with db._sessions.begin() as session:
+        session.add(
+            Bot(
+                bot_id=2,
+                bot_name="other",
+                account_no="TEST",
+                strategy_id=1,
+                trade_symbols=["BBB", "CCC"],
+                initial_budget=100_000,
+                available_budget=100_000,
+                total_profit_loss=0,
+            )
+        )
+
+
+def test_backtest_bots_may_share_symbols(db, overlapping_bots):
+    orchestrator = BotOrchestrator({"SMA": SMAStrategy}, TradingMode.Backtest, db=db)
+
+    assert orchestrator.symbols() == ["AAA", "BBB", "CCC"]
+    bots = list(orchestrator._bots.values())
+    assert bots[0]._strategy is bots[1]._strategy
+
+
+def test_live_bots_may_not_share_symbols(db, overlapping_bots):
+    with pytest.raises(ValueError, match="other trades BBB, already traded by test"):
+        BotOrchestrator({"SMA": SMAStrategy}, TradingMode.Live, db=db)
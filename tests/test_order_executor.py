@@ -0,0 +1,178 @@
+import threading
+import time
+
+from core.market import StubBroker
+from core.order_executor import AsyncOrderExecutor, UnresolvedOrder
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from database.model import OrderStatus, Signal, SideType, Trade
+from models.market import PlaceOrder
+from models.trading_bot import TradingMode
+
+
+class CountingBroker(StubBroker):
+    # Records the most broker calls in flight at once, rejects each symbol's
+    # first `rejections` calls and delays the symbols in `slow`
+    def __init__(self, rejections: int = 0, slow: dict = None, **kwargs):
+        super().__init__(reject_rate=0, **kwargs)
+        self.rejections = rejections
+        self.slow = slow or {}
+        self.calls = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def place_order(self, place_order: PlaceOrder):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            calls = self.calls[place_order.symbol] = (
+                self.calls.get(place_order.symbol, 0) + 1
+            )
+        try:
+            time.sleep(self.slow.get(place_order.symbol, 0))
+            trade = super().place_order(place_order)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return None if calls <= self.rejections else trade
+
+
+class Notifier:
+    def send(self, message):
+        pass
+
+
+def make_orders(count: int) -> list[PlaceOrder]:
+    return [
+        PlaceOrder(
+            account_no="TEST",
+            symbol=f"S{index:02d}",
+            side=SideType.buy,
+            price=10,
+            volume=100,
+        )
+        for index in range(count)
+    ]
+
+
+def test_concurrency_is_capped():
+    broker = CountingBroker(latency=0.05)
+    executor = AsyncOrderExecutor(broker, max_concurrency=4, retry_delay=0)
+    trades = executor.run(make_orders(16))
+    executor.close()
+
+    assert all(isinstance(trade, Trade) for trade in trades)
+    assert broker.max_in_flight == 4
+
+
+def test_rejected_orders_are_retried():
+    broker = CountingBroker(rejections=2, latency=0)
+    executor = AsyncOrderExecutor(broker, max_retries=3, retry_delay=0)
+    trades = executor.run(make_orders(3))
+    executor.close()
+
+    assert all(isinstance(trade, Trade) for trade in trades)
+    assert broker.calls == {"S00": 3, "S01": 3, "S02": 3}
+
+
+def test_orders_fail_after_max_retries():
+    broker = CountingBroker(rejections=10, latency=0)
+    alerts = []
+    executor = AsyncOrderExecutor(
+        broker, max_retries=3, retry_delay=0, alert=alerts.append
+    )
+    trades = executor.run(make_orders(1))
+    executor.close()
+
+    assert trades == [None]
+    assert broker.calls == {"S00": 3}
+    assert "failed after 3 attempts" in alerts[-1]
+
+
+def test_timeout_does_not_wait_for_the_broker():
+    broker = CountingBroker(latency=0.5)
+    executor = AsyncOrderExecutor(broker, order_timeout=0.1, retry_delay=0)
+    started = time.monotonic()
+    results = executor.run(make_orders(2))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.4
+    assert all(isinstance(result, UnresolvedOrder) for result in results)
+    # A timed out order may still fill, so it is not resent
+    assert broker.calls == {"S00": 1, "S01": 1}
+    assert executor.stuck == 2
+
+    # Slow, then filled: the broker's answer arrives after the timeout
+    for result in results:
+        result.future.result(timeout=2)
+        assert result.done()
+        assert isinstance(result.result(), Trade)
+    assert executor.stuck == 0
+    executor.close()
+
+
+def test_hung_call_does_not_delay_other_orders():
+    broker = CountingBroker(slow={"S00": 1}, latency=0.05)
+    executor = AsyncOrderExecutor(
+        broker, max_concurrency=2, order_timeout=0.3, retry_delay=0
+    )
+    results = executor.run(make_orders(5))
+    executor.close()
+
+    assert isinstance(results[0], UnresolvedOrder)
+    assert all(isinstance(result, Trade) for result in results[1:])
+
+
+def test_orders_fail_fast_while_every_thread_is_held():
+    broker = CountingBroker(slow={"S00": 1}, latency=0)
+    alerts = []
+    executor = AsyncOrderExecutor(
+        broker, max_concurrency=1, order_timeout=0.1, alert=alerts.append
+    )
+    assert isinstance(executor.run(make_orders(1))[0], UnresolvedOrder)
+
+    started = time.monotonic()
+    assert executor.run(make_orders(3)[1:]) == [None, None]
+    assert time.monotonic() - started < 0.1
+    assert broker.calls == {"S00": 1}
+    assert "not sent" in alerts[-1]
+    executor.close()
+
+
+def test_timed_out_order_is_booked_once_filled(db, bot_info):
+    bot = TradingBot(
+        SMAStrategy,
+        TradingMode.Live,
+        verbose=False,
+        db=db,
+        bot_info=bot_info,
+        notifier=Notifier(),
+    )
+    bot._order_executor = AsyncOrderExecutor(
+        CountingBroker(latency=0.3), order_timeout=0.05, alert=Notifier().send
+    )
+    bot._prepare_ohlc_data()
+    positions, entry_prices, volumes, _ = bot._initialize_trading_data()
+
+    bot._execute_buy("AAA", 10.0, 100, positions, entry_prices, volumes, None, "test")
+    bot._submit_pending_orders(positions, entry_prices, volumes)
+
+    # Unknown outcome: still Pending, budget still reserved, no repeat order
+    with db._sessions() as session:
+        assert session.query(Signal.status).one() == (OrderStatus.Pending,)
+    reserved = 100 * 10.0 * (1 + bot._market.commission_rate)
+    assert bot._available_budget == 100_000 - reserved
+    assert bot._is_duplicate_signal(Signal(bot_id=1, symbol="AAA", type=SideType.buy))
+
+    bot._unresolved_orders[0][1].future.result(timeout=2)
+    bot._reconcile_orders(positions, entry_prices, volumes)
+
+    with db._sessions() as session:
+        assert session.query(Signal.status).one() == (OrderStatus.Open,)
+        assert session.query(Trade).count() == 1
+    assert bot._unresolved_orders == []
+    assert positions["AAA"] == 100
+    assert bot._live_state.holding_volume("AAA") == 100
+    assert bot._available_budget == bot._live_state.available_budget
+    bot.close()
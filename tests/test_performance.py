@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.ledger import TradeLedger
+from core.performance import equity_curve, evaluate, match_fifo, match_lots
+
+
+def make_ledger(*fills) -> TradeLedger:
+    ledger = TradeLedger()
+    for side, date, volume, price, commission in fills:
+        ledger.append(side, pd.Timestamp(date), volume, price, commission)
+    return ledger
+
+
+def test_partial_closes_match_oldest_lots_first():
+    ledger = make_ledger(
+        ("buy", "2024-01-01", 100, 10.0, 0),
+        ("buy", "2024-01-02", 100, 12.0, 0),
+        ("sell", "2024-01-03", 50, 11.0, 0),
+        ("sell", "2024-01-04", 100, 13.0, 0),
+        ("sell", "2024-01-05", 100, 14.0, 0),
+    )
+    # 50 of the first lot, then 50 of the first and 50 of the second, then
+    # the 50 left of the second. The unmatched 50 are ignored
+    np.testing.assert_allclose(
+        match_lots(ledger),
+        [[500, 550], [500 + 600, 1300], [600, 700]],
+    )
+    np.testing.assert_allclose(match_fifo(ledger), [50, 200, 100])
+
+
+def test_commissions_are_charged_on_both_sides():
+    ledger = make_ledger(
+        ("buy", "2024-01-01", 100, 10.0, 2.0),
+        ("sell", "2024-01-02", 40, 11.0, 1.0),
+        ("sell", "2024-01-03", 60, 11.0, 1.0),
+    )
+    round_trips = match_lots(ledger)
+    np.testing.assert_allclose(round_trips[:, 0], [400.8, 601.2])
+    np.testing.assert_allclose(round_trips[:, 1], [439, 659])
+    assert match_fifo(ledger).sum() == pytest.approx(100 - 4)
+
+
+def test_fills_are_matched_in_date_order():
+    # A sell booked ahead of the buy it closes, as live rows ahead of
+    # simulated fills would be
+    ledger = make_ledger(
+        ("sell", "2024-01-03", 100, 12.0, 0),
+        ("buy", "2024-01-01", 100, 10.0, 0),
+    )
+    np.testing.assert_allclose(match_fifo(ledger), [200])
+
+
+def test_fills_outside_the_bars_are_dropped():
+    closes = pd.DataFrame(
+        {"AAA": [10.0, 11.0, 12.0]},
+        index=pd.date_range("2024-01-02", periods=3),
+    )
+    ledger = make_ledger(
+        ("buy", "2023-12-01", 100, 5.0, 0),
+        ("buy", "2024-01-03 15:00", 10, 11.0, 1.0),
+        ("sell", "2024-02-01", 10, 20.0, 0),
+    )
+    equity, gross, traded_notional = equity_curve({"AAA": ledger}, closes, 1000)
+
+    np.testing.assert_allclose(equity, [1000, 999, 1009])
+    np.testing.assert_allclose(gross, [0, 110, 120])
+    assert traded_notional == 110
+
+
+def test_risk_metrics_of_a_round_trip():
+    closes = pd.DataFrame(
+        {"AAA": [10.0, 11.0, 9.0, 12.0]},
+        index=pd.date_range("2024-01-01", periods=4),
+    )
+    ledger = make_ledger(
+        ("buy", "2024-01-01", 100, 10.0, 0),
+        ("sell", "2024-01-04", 100, 12.0, 0),
+    )
+    performance, curve = evaluate({"AAA": ledger}, closes, 1000)
+
+    np.testing.assert_allclose(curve["equity"], [1000, 1100, 900, 1200])
+    assert performance["total_profit_loss"] == 200
+    assert performance["total_trades"] == 1
+    assert performance["win_rate"] == 100
+    assert performance["max_drawdown"] == pytest.approx((900 / 1100 - 1) * 100)
+    returns = np.array([0.1, 900 / 1100 - 1, 1200 / 900 - 1])
+    assert performance["sharpe_ratio"] == pytest.approx(
+        returns.mean() / returns.std(ddof=1) * np.sqrt(252)
+    )
+    assert performance["turnover"] == pytest.approx(2200 / 1050)
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.synthetic import InMemoryDB, generate_ohlcv
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+
+class LookaheadStrategy(SMAStrategy):
+    # Reads the next bar's close, so the full frame differs from every prefix
+    def calculate_indicators(self, data, cache=True):
+        data = super().calculate_indicators(data, cache)
+        return data.assign(next_close=data["close"].shift(-1))
+
+
+def make_bot(strategy_class, n_symbols=3, n_days=80) -> TradingBot:
+    frames = generate_ohlcv(n_symbols, n_days, seed=5)
+    strategy = strategy_class(short_window=5, long_window=20)
+    bot = TradingBot(
+        strategy_class,
+        TradingMode.Backtest,
+        verbose=False,
+        db=InMemoryDB(frames),
+        strategy=strategy,
+    )
+    bot.load_backtest_data()
+    return bot
+
+
+def test_causal_indicators_pass_the_check():
+    bot = make_bot(SMAStrategy)
+    bot._precompute_indicators()
+    bot._verify_precomputed_indicators()
+
+
+def test_lookahead_indicators_fail_the_check():
+    bot = make_bot(LookaheadStrategy)
+    bot._precompute_indicators()
+    with pytest.raises(ValueError, match="SYN0000 at"):
+        bot._verify_precomputed_indicators()
+
+
+def test_precomputed_rows_trade_like_per_bar_calculation():
+    results = []
+    for precompute in (True, False):
+        bot = make_bot(SMAStrategy)
+        performance = bot.run_backtest(precompute_indicators=precompute)
+        results.append(
+            (
+                performance,
+                {stock: ledger.records for stock, ledger in bot.ledgers.items()},
+            )
+        )
+
+    (precomputed, precomputed_trades), (per_bar, per_bar_trades) = results
+    assert precomputed == per_bar
+    assert precomputed["total_trades"] > 0
+    for stock, records in precomputed_trades.items():
+        assert (records == per_bar_trades[stock]).all()
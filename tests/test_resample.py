@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.resample import check_timeframe, daily_closes, resample, resample_ohlcv
+
+
+def make_bars() -> pd.DataFrame:
+    # Two sessions of one-minute bars with a gap inside the first
+    rng = np.random.default_rng(0)
+    index = pd.DatetimeIndex(
+        list(pd.date_range("2024-01-02 10:00", periods=23, freq="1min"))
+        + list(pd.date_range("2024-01-02 10:31", periods=9, freq="1min"))
+        + list(pd.date_range("2024-01-03 10:02", periods=20, freq="1min")),
+        name="date",
+    )
+    close = 100 + rng.normal(0, 1, len(index)).cumsum()
+    open_ = close + rng.normal(0, 0.1, len(index))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + 0.5,
+            "low": np.minimum(open_, close) - 0.5,
+            "close": close,
+            "volume": rng.integers(1, 1000, len(index)).astype(float),
+        },
+        index=index,
+    )
+
+
+@pytest.mark.parametrize("timeframe, rule", [("5m", "5min"), ("1h", "1h")])
+def test_reduceat_matches_pandas_resample(timeframe, rule):
+    bars = make_bars()
+    result = resample_ohlcv(*(bars[column] for column in bars), timeframe)
+
+    expected = (
+        bars.resample(rule)
+        .agg(
+            {
+                "open": "first",
+                "high": "max",
+                "low": "min",
+                "close": "last",
+                "volume": "sum",
+            }
+        )
+        .dropna()
+    )
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_resample_keeps_only_buckets_with_bars():
+    result = resample(make_bars(), "15m")
+
+    assert result.index.strftime("%d %H:%M").tolist() == [
+        "02 10:00",
+        "02 10:15",
+        "02 10:30",
+        "03 10:00",
+        "03 10:15",
+    ]
+    assert result["volume"].sum() == make_bars()["volume"].sum()
+
+
+def test_timeframes_must_be_multiples_of_the_base():
+    check_timeframe("15m", "5m")
+    with pytest.raises(ValueError, match="can't be built"):
+        check_timeframe("15m", "1h")
+    with pytest.raises(ValueError, match="Unknown timeframe"):
+        check_timeframe("2m", "1m")
+
+
+def test_daily_closes_keep_the_last_bar_of_each_day():
+    bars = make_bars()
+    closes = daily_closes(bars[["close"]])
+
+    assert closes.index.tolist() == [
+        pd.Timestamp("2024-01-02"),
+        pd.Timestamp("2024-01-03"),
+    ]
+    assert closes["close"].tolist() == [
+        bars.loc["2024-01-02", "close"].iloc[-1],
+        bars.loc["2024-01-03", "close"].iloc[-1],
+    ]
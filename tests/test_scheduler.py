@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytz
+
+from core.market_calendar import MarketCalendar
+from core.scheduler import MarketScheduler
+from models.market import MarketPhase
+
+TZ = pytz.timezone("Asia/Bangkok")
+PHASES = {
+    "Pre-Open": {"start": ["09:30:00"], "end": "10:00:00"},
+    "Market Open": {"start": ["10:00:00"], "end": "12:30:00"},
+    "Market Close": {"start": ["16:30:00"], "end": "17:00:00"},
+}
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return TZ.localize(datetime(2024, 1, day, hour, minute))
+
+
+class FakeClock:
+    # Time only moves when the scheduler sleeps
+    def __init__(self, now: datetime):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+
+def make_scheduler(clock: FakeClock = None) -> MarketScheduler:
+    # 2 January 2024 is a holiday, 6 and 7 a weekend
+    market = SimpleNamespace(
+        calendar=MarketCalendar(PHASES, ["2024-01-02"], start="2023-12-01"),
+        bangkok_tz=TZ,
+    )
+    if clock is None:
+        return MarketScheduler(market)
+    return MarketScheduler(market, clock=clock, sleep=clock.sleep)
+
+
+def test_next_event_is_the_next_handled_transition():
+    scheduler = make_scheduler()
+    pre_open, close = object(), object()
+    scheduler.on_phase(MarketPhase.PreOpen, pre_open)
+    scheduler.on_phase(MarketPhase.MarketClose, close)
+
+    assert scheduler.next_event(at(1, 8)) == (at(1, 9, 30), [pre_open])
+    # Transitions without handlers are skipped
+    assert scheduler.next_event(at(1, 9, 30)) == (at(1, 16, 30), [close])
+    # Over the holiday
+    assert scheduler.next_event(at(1, 16, 30)) == (at(3, 9, 30), [pre_open])
+    # Over the weekend
+    assert scheduler.next_event(at(5, 17)) == (at(8, 9, 30), [pre_open])
+
+
+def test_interval_jobs_run_inside_their_phase():
+    scheduler = make_scheduler()
+    job = object()
+    scheduler.every(60, job)
+
+    events = []
+    after = at(1, 0)
+    for _ in range(3):
+        after, callbacks = scheduler.next_event(after)
+        events.append((after, callbacks))
+    assert events == [(at(1, 11), [job]), (at(1, 12), [job]), (at(3, 11), [job])]
+
+
+def test_run_sleeps_until_each_event():
+    clock = FakeClock(at(1, 10, 15))
+    scheduler = make_scheduler(clock)
+    calls = []
+    scheduler.on_phase(MarketPhase.MarketOpen, lambda now: calls.append(("open", now)))
+
+    def on_close(now):
+        calls.append(("close", now))
+        scheduler.stop()
+
+    scheduler.on_phase(MarketPhase.MarketClose, on_close)
+    scheduler.run()
+
+    # Started mid-session, so the open handler runs straight away
+    assert calls == [("open", at(1, 10, 15)), ("close", at(1, 16, 30))]
+    assert clock.sleeps == [(at(1, 16, 30) - at(1, 10, 15)).total_seconds()]
@@ -0,0 +1,62 @@
+import numpy as np
+
+from benchmarks.synthetic import InMemoryDB, generate_ohlcv
+from core.strategy.sma_strategy import SMAStrategy
+from core.trading_bot import TradingBot
+from models.trading_bot import TradingMode
+
+SEEDED_BARS = 60
+
+
+class CountingStrategy(SMAStrategy):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seeded = []
+
+    def seed_indicators(self, symbol, history):
+        self.seeded.append(symbol)
+        return super().seed_indicators(symbol, history)
+
+
+def make_bot():
+    frames = generate_ohlcv(3, 120, seed=7)
+    strategy = CountingStrategy(short_window=5, long_window=20)
+    bot = TradingBot(
+        CountingStrategy,
+        TradingMode.Live,
+        verbose=False,
+        db=InMemoryDB(frames),
+        strategy=strategy,
+    )
+    return bot, frames
+
+
+def test_streamed_values_match_batch_indicators():
+    bot, frames = make_bot()
+    bot._dataframes = {stock: df.iloc[:SEEDED_BARS] for stock, df in frames.items()}
+    bot._seed_indicator_states()
+
+    for stock, df in frames.items():
+        batch = bot._strategy.calculate_indicators(df.copy(), cache=False)
+        for current_date in df.index[SEEDED_BARS:]:
+            streamed = bot._indicator_bar(stock, df, current_date)
+            expected = batch.loc[current_date]
+            np.testing.assert_allclose(
+                [streamed[column] for column in expected.index],
+                expected.to_numpy(float),
+                rtol=1e-9,
+                equal_nan=True,
+            )
+
+
+def test_states_are_seeded_once_and_reloads_push_new_bars():
+    bot, frames = make_bot()
+    bot._dataframes = {stock: df.iloc[:SEEDED_BARS] for stock, df in frames.items()}
+    bot._seed_indicator_states()
+    # Next Pre-Open, the reloaded frames have more bars
+    bot._dataframes = frames
+    bot._seed_indicator_states()
+
+    assert bot._strategy.seeded == list(frames)
+    for stock, df in frames.items():
+        assert bot._strategy.indicator_state(stock).timestamp == df.index[-1]
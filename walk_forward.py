@@ -0,0 +1,21 @@
+from core.strategy.sma_strategy import SMAStrategy
+from core.walk_forward import run_walk_forward
+
+PARAM_GRID = {
+    "short_window": [20, 50, 100],
+    "long_window": [150, 200, 250],
+    "rsi_period": [14],
+    "rsi_buy_threshold": [25, 30, 35],
+    "rsi_sell_threshold": [65, 70, 75],
+}
+
+START_DATE = "2015-01-01"
+END_DATE = "2024-12-31"
+
+
+if __name__ == "__main__":
+    results = run_walk_forward(SMAStrategy, PARAM_GRID, START_DATE, END_DATE)
+    print(results["folds"].to_string())
+    print("Out-of-sample performance:")
+    for key, value in results["performance"].items():
+        print(f"  {key}: {value}")